@@ -1,6 +1,7 @@
 from typing import Any
 
 from catalog.models import Book
+from catalog.pagination import EstimatedCountPaginator
 from django.contrib.auth import authenticate, get_user_model, login, views
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models.query import QuerySet
@@ -23,9 +24,10 @@ class AccountProfileView(LoginRequiredMixin, generic.ListView):
     context_object_name = "books"
     template_name = "profile.html"
     paginate_by = 6
+    paginator_class = EstimatedCountPaginator
 
     def get_queryset(self) -> QuerySet[Any]:
-        return Book.objects.filter(added_by=self.request.user)
+        return Book.objects.cards().filter(added_by=self.request.user).cached()
 
 
 class RegisterUserView(generic.FormView):
@@ -1,10 +1,13 @@
 from django.contrib import admin
 
 from .models import Author, Book, BookComment, BookRating
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(Author)
 class AuthorAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = ["name", "date_of_birth", "bio_short", "preview"]
     fields = ["name", "date_of_birth", "bio", "photo", "preview"]
     readonly_fields = ["preview"]
@@ -13,6 +16,8 @@ class AuthorAdmin(admin.ModelAdmin):
 
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = [
         "title",
         "author",
@@ -36,6 +41,8 @@ class BookAdmin(admin.ModelAdmin):
 
 @admin.register(BookComment)
 class BookCommentAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = [
         "user",
         "book",
@@ -48,5 +55,8 @@ class BookCommentAdmin(admin.ModelAdmin):
 
 @admin.register(BookRating)
 class BookRatingAdmin(admin.ModelAdmin):
-    list_display = ["rate", "book", "user"]
-    fields = ["rate", "book", "user"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_display = ["rate", "book", "user", "updated_at"]
+    fields = ["rate", "book", "user", "created_at", "updated_at"]
+    readonly_fields = ["created_at", "updated_at"]
@@ -0,0 +1,170 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+
+from .models import Author, Book
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+class PrefixIndex:
+    """Индекс подсказок поиска в памяти процесса.
+
+    Хранит отсортированный список ключей ``(ключ, тип, id)``, где ключ —
+    нормализованное название, начиная с каждого его слова, поэтому
+    запрос «мир» находит и «Мир», и «Война и мир». Поиск по префиксу
+    выполняется двоичным поиском без обращений к базе данных.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._built_at = None
+        self._changes = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            self._built_at = None
+
+    def build(self) -> None:
+        with self._build_lock:
+            self._build()
+
+    def ensure_fresh(self) -> None:
+        """Строит индекс при первом обращении и обновляет устаревший.
+
+        Первое построение выполняется один раз под блокировкой, остальные
+        запросы дожидаются его. Устаревший индекс перестраивается в фоновом
+        потоке, а запросы тем временем получают подсказки из прежнего.
+        Изменения в этом процессе индекс получает сразу от сигналов,
+        перестроение нужно для изменений из других процессов.
+        """
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self._build()
+            return
+        if time.monotonic() - self._built_at <= (
+            settings.AUTOCOMPLETE_REFRESH_INTERVAL
+        ):
+            return
+        if self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh, daemon=True).start()
+
+    def add(self, kind: str, pk, label: str) -> None:
+        self._change(kind, pk, label)
+
+    def remove(self, kind: str, pk) -> None:
+        self._change(kind, pk, None)
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self.ensure_fresh()
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            matches = {}
+            for key, kind, pk in self._keys[position:]:
+                if not key.startswith(prefix) or len(matches) >= limit * 5:
+                    break
+                label = self._entries[(kind, pk)]
+                starts_label = key == normalize(label)
+                if (kind, pk) not in matches or starts_label:
+                    matches[(kind, pk)] = (starts_label, label)
+        ranked = sorted(
+            matches.items(),
+            key=lambda item: (not item[1][0], normalize(item[1][1])),
+        )
+        return [
+            {
+                "type": kind,
+                "id": str(pk),
+                "label": label,
+                "url": reverse(f"{kind}-detail", args=[str(pk)]),
+            }
+            for (kind, pk), (_, label) in ranked[:limit]
+        ]
+
+    def _build(self) -> None:
+        # Изменения, пришедшие от сигналов во время чтения из базы данных,
+        # запоминаются и повторяются на новом индексе, иначе замена индекса
+        # потеряла бы их.
+        with self._lock:
+            self._changes = []
+        try:
+            entries = {}
+            for pk, title in Book.objects.values_list("pk", "title"):
+                entries[("book", pk)] = title
+            for pk, name in Author.objects.values_list("pk", "name"):
+                entries[("author", pk)] = name
+            keys = [
+                (key, kind, pk)
+                for (kind, pk), label in entries.items()
+                for key in self._keys_for(label)
+            ]
+            keys.sort()
+        except BaseException:
+            with self._lock:
+                self._changes = None
+            raise
+        with self._lock:
+            changes, self._changes = self._changes, None
+            self._keys = keys
+            self._entries = entries
+            self._built_at = time.monotonic()
+            for kind, pk, label in changes:
+                self._apply(kind, pk, label)
+
+    def _refresh(self) -> None:
+        try:
+            self._build()
+        finally:
+            connections.close_all()
+            self._build_lock.release()
+
+    def _change(self, kind: str, pk, label: str | None) -> None:
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((kind, pk, label))
+            if self._built_at is not None:
+                self._apply(kind, pk, label)
+
+    def _apply(self, kind: str, pk, label: str | None) -> None:
+        self._discard(kind, pk)
+        if label is None:
+            return
+        self._entries[(kind, pk)] = label
+        for key in self._keys_for(label):
+            insort(self._keys, (key, kind, pk))
+
+    def _discard(self, kind: str, pk) -> None:
+        label = self._entries.pop((kind, pk), None)
+        if label is None:
+            return
+        for key in self._keys_for(label):
+            position = bisect_left(self._keys, (key, kind, pk))
+            if position < len(self._keys) and self._keys[position] == (
+                key,
+                kind,
+                pk,
+            ):
+                del self._keys[position]
+
+    @staticmethod
+    def _keys_for(label: str) -> set[str]:
+        words = normalize(label).split(" ")
+        return {" ".join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+index = PrefixIndex()
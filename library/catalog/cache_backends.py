@@ -0,0 +1,200 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+GENERATION_KEY = "tiered:generation"
+
+_MISSING = object()
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class _LocalStore:
+    def __init__(self) -> None:
+        self.entries = OrderedDict()
+        self.generation = None
+        self.lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    """Кэш процесса (LRU с ограничением размера и времени жизни) перед
+    общим кэшем Django, заданным псевдонимом в ``LOCATION``.
+
+    Чтение сначала ищет запись в памяти процесса, запись идет в оба уровня.
+    Удаление, ``incr``/``decr`` и ``clear`` увеличивают общий номер
+    поколения, а локальные записи действуют только при совпадении поколения.
+    Поколение перечитывается из общего кэша при первом обращении после
+    ``close()``, который Django вызывает в конце каждого запроса, поэтому
+    запрос видит изменения, сделанные другими воркерами, за одно обращение
+    к общему кэшу. ``set`` поколение не меняет: перезаписываемые значения
+    должны содержать версию в ключе или в самом значении.
+
+    Параметры ``OPTIONS``: ``MAX_ENTRIES`` — размер локального кэша,
+    ``LOCAL_TIMEOUT`` — время жизни локальной записи в секундах.
+    """
+
+    def __init__(self, location: str, params: dict) -> None:
+        super().__init__(params)
+        self._alias = location or "shared"
+        self._local_timeout = params.get("OPTIONS", {}).get(
+            "LOCAL_TIMEOUT", 60
+        )
+        with _stores_lock:
+            self._store = _stores.setdefault(self._alias, _LocalStore())
+        self._checked = False
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self._alias]
+
+    def _sync(self) -> None:
+        if self._checked:
+            return
+        generation = self.shared.get(GENERATION_KEY)
+        if generation is None:
+            self.shared.add(GENERATION_KEY, time.time_ns(), timeout=None)
+            generation = self.shared.get(GENERATION_KEY)
+        self._set_generation(generation)
+
+    def _bump(self) -> None:
+        try:
+            generation = self.shared.incr(GENERATION_KEY)
+        except ValueError:
+            self.shared.add(GENERATION_KEY, time.time_ns(), timeout=None)
+            generation = self.shared.get(GENERATION_KEY)
+        self._set_generation(generation)
+
+    def _set_generation(self, generation) -> None:
+        with self._store.lock:
+            if self._store.generation != generation:
+                self._store.entries.clear()
+                self._store.generation = generation
+        self._checked = True
+
+    def _get_local(self, key: str):
+        with self._store.lock:
+            entry = self._store.entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, data = entry
+            if expires <= time.monotonic():
+                del self._store.entries[key]
+                return _MISSING
+            self._store.entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def _set_local(self, key: str, value, timeout=DEFAULT_TIMEOUT) -> None:
+        ttl = self._local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0 or self._max_entries <= 0:
+            self._delete_local(key)
+            return
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._store.lock:
+            self._store.entries[key] = (time.monotonic() + ttl, data)
+            self._store.entries.move_to_end(key)
+            while len(self._store.entries) > self._max_entries:
+                self._store.entries.popitem(last=False)
+
+    def _delete_local(self, key: str) -> None:
+        with self._store.lock:
+            self._store.entries.pop(key, None)
+
+    def get(self, key, default=None, version=None):
+        self._sync()
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self._get_local(local_key)
+        if value is _MISSING:
+            value = self.shared.get(key, _MISSING, version=version)
+            if value is _MISSING:
+                return default
+            self._set_local(local_key, value)
+        return value
+
+    def get_many(self, keys, version=None) -> dict:
+        self._sync()
+        found, missing = {}, []
+        for key in keys:
+            local_key = self.make_and_validate_key(key, version=version)
+            value = self._get_local(local_key)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            values = self.shared.get_many(missing, version=version)
+            for key, value in values.items():
+                self._set_local(
+                    self.make_and_validate_key(key, version=version), value
+                )
+            found.update(values)
+        return found
+
+    def has_key(self, key, version=None) -> bool:
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> None:
+        self._sync()
+        self.shared.set(key, value, timeout, version=version)
+        self._set_local(
+            self.make_and_validate_key(key, version=version), value, timeout
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        self._sync()
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._set_local(
+                self.make_and_validate_key(key, version=version),
+                value,
+                timeout,
+            )
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None) -> list:
+        self._sync()
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._set_local(
+                    self.make_and_validate_key(key, version=version),
+                    value,
+                    timeout,
+                )
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        self._delete_local(self.make_and_validate_key(key, version=version))
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None) -> bool:
+        deleted = self.shared.delete(key, version=version)
+        self._bump()
+        return deleted
+
+    def delete_many(self, keys, version=None) -> None:
+        self.shared.delete_many(keys, version=version)
+        self._bump()
+
+    def incr(self, key, delta=1, version=None) -> int:
+        value = self.shared.incr(key, delta, version=version)
+        self._bump()
+        self._set_local(
+            self.make_and_validate_key(key, version=version), value
+        )
+        return value
+
+    def clear(self) -> None:
+        self.shared.clear()
+        with self._store.lock:
+            self._store.entries.clear()
+            self._store.generation = None
+        self._checked = False
+
+    def close(self, **kwargs) -> None:
+        self._checked = False
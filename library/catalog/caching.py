@@ -0,0 +1,314 @@
+import time
+from asyncio import iscoroutinefunction
+from functools import wraps
+from hashlib import md5
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
+
+VERSION_KEY_PREFIX = "caching:version:"
+STATS_KEY_PREFIX = "caching:stats:"
+PAGE_KEY_PREFIX = "caching:page:"
+FRAGMENT_KEY_PREFIX = "caching:fragment:"
+LOCK_KEY_PREFIX = "caching:lock:"
+
+# Счетчики увеличиваются на каждом запросе и поэтому пишутся в общий кэш
+# мимо кэша процесса, которому каждое увеличение сбрасывало бы поколение.
+# Там же берутся блокировки пересчета.
+shared_cache = ConnectionProxy(caches, "shared")
+
+STATS = {
+    "pages": ["hits", "stale", "misses"],
+    "facets": ["hits", "stale", "recomputes"],
+    "querysets": ["hits", "misses", "invalidations"],
+}
+LOOKUPS = ["hits", "stale", "misses", "recomputes"]
+
+
+def get_versions(scopes) -> dict[str, int]:
+    """Текущие версии областей кэша, прочитанные одним обращением к кэшу.
+
+    Отсутствующая версия (новая область или вытесненный ключ) заводится
+    заново из текущего времени, чтобы не совпасть ни с одной из тех, что
+    сохранены в записях кэша раньше.
+    """
+    keys = {f"{VERSION_KEY_PREFIX}{scope}": scope for scope in scopes}
+    found = cache.get_many(keys)
+    versions = {keys[key]: value for key, value in found.items()}
+    for key, scope in keys.items():
+        if scope not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[scope] = cache.get(key)
+    return versions
+
+
+def invalidate(*scopes) -> None:
+    """Увеличивает версии областей, и зависящие от них записи устаревают.
+
+    Внутри транзакции версии увеличиваются еще раз после ее фиксации,
+    чтобы не осталась в кэше страница, которую параллельный запрос успел
+    собрать по старым данным.
+    """
+    scopes = set(scopes)
+    _bump(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def _bump(scopes) -> None:
+    for scope in scopes:
+        key = f"{VERSION_KEY_PREFIX}{scope}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def record(group: str, name: str) -> None:
+    key = f"{STATS_KEY_PREFIX}{group}:{name}"
+    try:
+        shared_cache.incr(key)
+    except ValueError:
+        if not shared_cache.add(key, 1, timeout=None):
+            shared_cache.incr(key)
+
+
+def get_stats() -> dict[str, dict]:
+    """Счетчики кэша по группам с долей попаданий (``hit_ratio``).
+
+    Доля считается от всех обращений к кэшу группы, включая выдачу
+    устаревших значений и пересчеты.
+    """
+    keys = {
+        f"{STATS_KEY_PREFIX}{group}:{name}": (group, name)
+        for group, names in STATS.items()
+        for name in names
+    }
+    values = shared_cache.get_many(keys)
+    stats = {}
+    for key, (group, name) in keys.items():
+        stats.setdefault(group, {})[name] = values.get(key, 0)
+    for counters in stats.values():
+        lookups = sum(counters.get(name, 0) for name in LOOKUPS)
+        counters["hit_ratio"] = (
+            round(counters.get("hits", 0) / lookups, 4) if lookups else None
+        )
+    return stats
+
+
+def render_fragments(objects, key, render) -> list[str]:
+    """Фрагменты разметки объектов, прочитанные из кэша одним ``get_many``.
+
+    ``key`` возвращает ключ фрагмента объекта, в который входит его версия
+    (например, дата изменения), поэтому измененный объект получает новый
+    ключ и явная инвалидация не нужна. Недостающие фрагменты собираются
+    функцией ``render`` и сохраняются одним ``set_many``.
+    """
+    keys = [f"{FRAGMENT_KEY_PREFIX}{key(obj)}" for obj in objects]
+    if not keys:
+        return []
+    found = cache.get_many(keys)
+    missing = {}
+    for cache_key, obj in zip(keys, objects):
+        if cache_key not in found:
+            found[cache_key] = missing[cache_key] = render(obj)
+    if missing:
+        cache.set_many(missing, settings.FRAGMENT_CACHE_TIMEOUT)
+    return [found[cache_key] for cache_key in keys]
+
+
+def _is_fresh(entry, version) -> bool:
+    return (
+        entry is not None
+        and entry["version"] == version
+        and entry["expires"] > time.time()
+    )
+
+
+def _get_entry(key: str, version) -> tuple[dict | None, bool]:
+    """Запись кэша и признак ее свежести.
+
+    Устаревшая запись перечитывается из общего кэша: копия в кэше процесса
+    могла остаться от времени до того, как другой воркер ее пересчитал.
+    """
+    entry = cache.get(key)
+    if _is_fresh(entry, version):
+        return entry, True
+    if entry is not None:
+        shared_entry = shared_cache.get(key)
+        if _is_fresh(shared_entry, version):
+            return shared_entry, True
+    return entry, False
+
+
+def _set_entry(key: str, value, version, timeout: int) -> None:
+    """Сохраняет значение, свежее ``timeout`` секунд, и еще
+    ``CACHE_STALE_TIMEOUT`` секунд доступное как устаревшее."""
+    cache.set(
+        key,
+        {"version": version, "expires": time.time() + timeout, "value": value},
+        timeout + settings.CACHE_STALE_TIMEOUT,
+    )
+
+
+def _acquire(key: str) -> bool:
+    return shared_cache.add(
+        f"{LOCK_KEY_PREFIX}{key}", 1, settings.CACHE_LOCK_TIMEOUT
+    )
+
+
+def _release(key: str) -> None:
+    shared_cache.delete(f"{LOCK_KEY_PREFIX}{key}")
+
+
+def _wait(key: str, version) -> dict | None:
+    """Ждет, пока держатель блокировки сохранит свежую запись, но не
+    дольше ``CACHE_LOCK_WAIT`` секунд: в асинхронных представлениях
+    ожидание занимает общий поток sync_to_async."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = shared_cache.get(key)
+        if _is_fresh(entry, version):
+            return entry
+        if shared_cache.get(f"{LOCK_KEY_PREFIX}{key}") is None:
+            return None
+    return None
+
+
+def get_or_compute(key: str, compute, version, timeout: int, group: str):
+    """Значение ``compute()`` из кэша с пересчетом в одном воркере.
+
+    Запись свежа ``timeout`` секунд, пока ее версия равна ``version``.
+    Устаревшую запись пересчитывает только воркер, взявший блокировку в
+    общем кэше, а остальные тем временем отдают устаревшее значение; если
+    значения еще нет, они недолго ждут пересчета, а затем считают его
+    сами. Счетчики группы ``group``:
+    попадания, выдача устаревших значений и пересчеты.
+    """
+    key = f"caching:{group}:{key}"
+    entry, fresh = _get_entry(key, version)
+    if fresh:
+        record(group, "hits")
+        return entry["value"]
+    locked = _acquire(key)
+    if not locked:
+        if entry is None:
+            entry = _wait(key, version)
+        if entry is not None:
+            record(group, "hits" if _is_fresh(entry, version) else "stale")
+            return entry["value"]
+    try:
+        value = compute()
+        _set_entry(key, value, version, timeout)
+    finally:
+        if locked:
+            _release(key)
+    record(group, "recomputes")
+    return value
+
+
+def object_scope(prefix: str):
+    """Области страницы объекта по его UUID из адреса (``pk``)."""
+
+    def scopes(*args, pk=None, **kwargs) -> list[str] | None:
+        try:
+            return [f"{prefix}:{UUID(str(pk))}"]
+        except ValueError:
+            return None
+
+    return scopes
+
+
+def cache_anonymous_page(scopes, stale: bool = False):
+    """Кэширует страницу для анонимных посетителей до изменения данных.
+
+    ``scopes`` — список областей, от которых зависит страница, или функция
+    от аргументов представления, возвращающая такой список (None — не
+    кэшировать). Вместе со страницей сохраняются версии этих областей,
+    прочитанные до ее формирования; если сигналы моделей с тех пор
+    увеличили хотя бы одну из них, страница собирается заново. Ответы
+    авторизованным пользователям и запросы кроме GET и HEAD не кэшируются.
+
+    С ``stale=True`` устаревшую страницу собирает заново только один
+    воркер, взявший блокировку, а остальные до сохранения новой версии
+    отдают устаревшую.
+    """
+
+    def lookup(request, *args, **kwargs):
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+        ):
+            return None, None
+        page_scopes = scopes(*args, **kwargs) if callable(scopes) else scopes
+        if page_scopes is None:
+            return None, None
+        key = md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"{PAGE_KEY_PREFIX}{key}"
+        versions = get_versions(page_scopes)
+        entry, fresh = _get_entry(key, versions)
+        if fresh:
+            record("pages", "hits")
+            return None, entry["value"]
+        locked = stale and _acquire(key)
+        if stale and not locked and entry is not None:
+            record("pages", "stale")
+            return None, entry["value"]
+        record("pages", "misses")
+        return {"key": key, "versions": versions, "locked": locked}, None
+
+    def store(state, response):
+        if state is None or response.status_code != 200:
+            return response
+        if response.streaming or response.cookies:
+            return response
+        if hasattr(response, "render"):
+            response.render()
+        _set_entry(
+            state["key"],
+            response,
+            state["versions"],
+            settings.PAGE_CACHE_TIMEOUT,
+        )
+        return response
+
+    def release(state):
+        if state is not None and state["locked"]:
+            _release(state["key"])
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def ainner(request, *args, **kwargs):
+                state, response = await sync_to_async(lookup)(
+                    request, *args, **kwargs
+                )
+                if response is not None:
+                    return response
+                try:
+                    response = await view_func(request, *args, **kwargs)
+                    return await sync_to_async(store)(state, response)
+                finally:
+                    await sync_to_async(release)(state)
+
+            return ainner
+
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            state, response = lookup(request, *args, **kwargs)
+            if response is not None:
+                return response
+            try:
+                return store(state, view_func(request, *args, **kwargs))
+            finally:
+                release(state)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,160 @@
+from asyncio import iscoroutinefunction
+from datetime import datetime
+from functools import wraps
+from hashlib import md5
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .models import Author, Book
+
+
+def _validators(request, version) -> tuple[str, int]:
+    """ETag и время последнего изменения в секундах для версии ресурса.
+
+    ETag строится из версии, адреса запроса с параметрами, пользователя
+    и заголовка Accept, поэтому разные представления одного ресурса не
+    путаются.
+    """
+    last_modified, *parts = version
+    user = request.user
+    key = "|".join(
+        map(
+            str,
+            [
+                last_modified.isoformat(),
+                *parts,
+                request.get_full_path(),
+                user.pk if user.is_authenticated else "",
+                request.META.get("HTTP_ACCEPT", ""),
+            ],
+        )
+    )
+    etag = quote_etag(md5(key.encode()).hexdigest())
+    return etag, int(last_modified.timestamp())
+
+
+def _finalize(response, etag, timestamp):
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        if timestamp is not None:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+    patch_vary_headers(response, ["Accept", "Cookie"])
+    return response
+
+
+def conditional(version_func):
+    """Условный GET по версии ресурса.
+
+    ``version_func`` получает аргументы представления и возвращает время
+    последнего изменения ресурса и значения, от которых еще зависит ответ
+    (например, количество записей), или None, если ресурса нет. Если
+    клиент прислал актуальные If-None-Match или If-Modified-Since, ответ
+    304 возвращается без вызова представления. Асинхронные представления
+    тоже поддерживаются: версия тогда читается в потоке через
+    sync_to_async.
+    """
+
+    def get_validators(request, *args, **kwargs):
+        version = version_func(*args, **kwargs)
+        if version is None:
+            return None
+        return _validators(request, version)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def ainner(request, *args, **kwargs):
+                version = await sync_to_async(get_validators)(
+                    request, *args, **kwargs
+                )
+                if version is None:
+                    return await view_func(request, *args, **kwargs)
+                etag, timestamp = version
+                response = get_conditional_response(
+                    request, etag=etag, last_modified=timestamp
+                )
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _finalize(response, etag, timestamp)
+
+            return ainner
+
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            version = get_validators(request, *args, **kwargs)
+            if version is None:
+                return view_func(request, *args, **kwargs)
+            etag, timestamp = version
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _finalize(response, etag, timestamp)
+
+        return inner
+
+    return decorator
+
+
+def conditional_page(request, rows, respond, *parts):
+    """Условный GET для уже прочитанной страницы списка.
+
+    Версия строится по самой странице: первичные ключи и наибольшее
+    ``updated_at`` ее строк и ``parts`` (например, общее количество
+    записей), поэтому проверка не читает всю таблицу. ``respond()``
+    сериализует страницу и вызывается, только если клиенту нужен ответ
+    целиком. Last-Modified не передается: время изменения с точностью до
+    секунды не отличает правки, сделанные в одну секунду.
+    """
+    if not rows:
+        return respond()
+    pks = ",".join(str(row["id"]) for row in rows)
+    version = (
+        max(row["updated_at"] for row in rows),
+        md5(pks.encode()).hexdigest(),
+        *parts,
+    )
+    etag, _ = _validators(request, version)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = respond()
+    return _finalize(response, etag, None)
+
+
+def book_version(pk) -> tuple[datetime] | None:
+    try:
+        updated_at = (
+            Book.objects.filter(pk=pk)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+    except ValidationError:
+        return None
+    if updated_at is None:
+        return None
+    return (updated_at,)
+
+
+def author_version(pk) -> tuple[datetime, int] | None:
+    try:
+        row = (
+            Author.objects.filter(pk=pk)
+            .annotate(
+                books_updated_at=Max("books__updated_at"),
+                books_count=Count("books"),
+            )
+            .values_list("updated_at", "books_updated_at", "books_count")
+            .first()
+        )
+    except ValidationError:
+        return None
+    if row is None:
+        return None
+    updated_at, books_updated_at, books_count = row
+    return max(updated_at, books_updated_at or updated_at), books_count
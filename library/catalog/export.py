@@ -0,0 +1,79 @@
+import csv
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Book, BookComment
+
+EXPORT_FIELDS = [
+    "id",
+    "title",
+    "author_id",
+    "author_name",
+    "publication_year",
+    "summary",
+    "rating_count",
+    "rating_sum",
+    "average_rating",
+    "comment_count",
+    "updated_at",
+]
+
+
+def export_rows(since: datetime | None = None):
+    """Книги каталога для выгрузки в порядке изменения.
+
+    Строки читаются курсором на стороне сервера порциями по
+    EXPORT_CHUNK_SIZE, поэтому память не зависит от размера каталога.
+    С ``since`` выбираются только книги, измененные начиная с этого
+    момента, в том числе из-за новых оценок и комментариев.
+    """
+    comment_count = (
+        BookComment.objects.filter(book=OuterRef("pk"))
+        .order_by()
+        .values("book")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    books = Book.objects.annotate(
+        author_name=F("author__name"),
+        comment_count=Coalesce(
+            Subquery(comment_count, output_field=IntegerField()), 0
+        ),
+    )
+    if since is not None:
+        books = books.filter(updated_at__gte=since)
+    columns = [name for name in EXPORT_FIELDS if name != "average_rating"]
+    rows = books.order_by("updated_at", "id").values_list(*columns)
+    for values in rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        row = dict(zip(columns, values))
+        row["average_rating"] = (
+            row["rating_sum"] / row["rating_count"]
+            if row["rating_count"]
+            else None
+        )
+        row["updated_at"] = row["updated_at"].isoformat()
+        yield {name: row[name] for name in EXPORT_FIELDS}
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(
+            "" if row[name] is None else row[name] for name in EXPORT_FIELDS
+        )
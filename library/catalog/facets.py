@@ -0,0 +1,113 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, QuerySet
+
+from .caching import get_or_compute
+from .models import Book
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def get_catalog_version() -> int:
+    cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+    return cache.get(CATALOG_VERSION_KEY, 1)
+
+
+def bump_catalog_version() -> None:
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+
+
+def facet_rows(queryset: QuerySet) -> list[tuple]:
+    """Считает книги выборки одним запросом с группировкой по автору и году.
+
+    Возвращает строки ``(id автора, имя автора, год издания, количество)``,
+    из которых build_facets() собирает счетчики по авторам и десятилетиям.
+    """
+    return list(
+        queryset.order_by()
+        .values_list("author_id", "author__name", "publication_year")
+        .annotate(count=Count("pk"))
+    )
+
+
+def catalog_facet_rows() -> list[tuple]:
+    """Строки facet_rows() по всему каталогу из кэша.
+
+    Запись хранит версию каталога, которую сигналы увеличивают при
+    изменении книг и авторов. Устаревшую сводку пересчитывает один воркер,
+    остальные тем временем отдают прежнюю.
+    """
+    return get_or_compute(
+        "catalog",
+        lambda: facet_rows(Book.objects.all()),
+        version=get_catalog_version(),
+        timeout=settings.FACETS_CACHE_TIMEOUT,
+        group="facets",
+    )
+
+
+def search_facet_rows(
+    queryset: QuerySet, query: str, mode: str
+) -> list[tuple]:
+    """Строки facet_rows() по результатам поиска из кэша.
+
+    Запрос и режим поиска входят в ключ, версия каталога — в запись.
+    """
+    key = md5(f"{mode}:{query}".encode()).hexdigest()
+    return get_or_compute(
+        key,
+        lambda: facet_rows(queryset),
+        version=get_catalog_version(),
+        timeout=settings.FACETS_CACHE_TIMEOUT,
+        group="facets",
+    )
+
+
+def build_facets(
+    rows: list[tuple], author=None, year_from=None, year_to=None
+) -> dict:
+    """Собирает счетчики по авторам и десятилетиям издания.
+
+    Счетчики каждого фасета учитывают фильтры остальных фасетов, но не
+    собственный, чтобы рядом с каждым вариантом было видно, сколько книг
+    останется после его выбора.
+    """
+    authors = {}
+    decades = {}
+    for author_id, name, year, count in rows:
+        if (year_from is None or year >= year_from) and (
+            year_to is None or year <= year_to
+        ):
+            entry = authors.setdefault(
+                author_id, {"id": str(author_id), "name": name, "count": 0}
+            )
+            entry["count"] += count
+        if author is None or author_id == author:
+            start = year // 10 * 10
+            entry = decades.setdefault(
+                start, {"start": start, "end": start + 9, "count": 0}
+            )
+            entry["count"] += count
+    for entry in authors.values():
+        entry["selected"] = entry["id"] == str(author)
+    for entry in decades.values():
+        entry["selected"] = (year_from, year_to) == (
+            entry["start"],
+            entry["end"],
+        )
+    ranked_authors = sorted(
+        authors.values(), key=lambda entry: (-entry["count"], entry["name"])
+    )
+    limit = settings.FACETS_AUTHOR_LIMIT
+    return {
+        "authors": ranked_authors[:limit]
+        + [entry for entry in ranked_authors[limit:] if entry["selected"]],
+        "decades": sorted(
+            decades.values(), key=lambda entry: entry["start"], reverse=True
+        ),
+    }
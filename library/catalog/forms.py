@@ -19,3 +19,41 @@ class BookRatingForm(forms.ModelForm):
     class Meta:
         model = BookRating
         fields = ["rate"]
+
+
+class BookFilterForm(forms.Form):
+    author = forms.UUIDField(label="Автор", required=False)
+    year_from = forms.IntegerField(
+        label="Год издания с", min_value=0, max_value=2999, required=False
+    )
+    year_to = forms.IntegerField(
+        label="Год издания по", min_value=0, max_value=2999, required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        year_from = cleaned_data.get("year_from")
+        year_to = cleaned_data.get("year_to")
+        if (
+            year_from is not None
+            and year_to is not None
+            and year_from > year_to
+        ):
+            self.add_error(
+                "year_to", "Конечный год не может быть меньше начального"
+            )
+        return cleaned_data
+
+    def filter(self, queryset):
+        """Применяет к выборке книг корректно заполненные фильтры."""
+        self.is_valid()
+        author = self.cleaned_data.get("author")
+        year_from = self.cleaned_data.get("year_from")
+        year_to = self.cleaned_data.get("year_to")
+        if author is not None:
+            queryset = queryset.filter(author_id=author)
+        if year_from is not None:
+            queryset = queryset.filter(publication_year__gte=year_from)
+        if year_to is not None:
+            queryset = queryset.filter(publication_year__lte=year_to)
+        return queryset
@@ -0,0 +1,74 @@
+from timeit import Timer
+
+from catalog.models import Book
+from catalog.renderers import FastJSONRenderer
+from catalog.serializers import BookSerializer, ValuesSerializer
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает скорость сериализации страницы книг API через "
+        "ModelSerializer и через values()"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=20,
+            help="Количество книг на странице",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=200,
+            help="Количество повторов каждого варианта",
+        )
+        parser.add_argument(
+            "--expand",
+            action="store_true",
+            help="Встраивать данные автора (expand=author)",
+        )
+
+    def handle(self, *args, **options) -> None:
+        page_size = options["page_size"]
+        expand = ["author"] if options["expand"] else []
+        context = {}
+        queryset = Book.objects.order_by("title", "author__name", "id")
+        if expand:
+            queryset = queryset.select_related("author")
+        values_serializer = ValuesSerializer(
+            BookSerializer(context=context, expand=expand)
+        )
+        values = queryset.values(*values_serializer.lookups)
+
+        def model_serializer():
+            data = BookSerializer(
+                queryset[:page_size], many=True, context=context, expand=expand
+            ).data
+            return JSONRenderer().render(data)
+
+        def fast_path():
+            data = [
+                values_serializer.to_representation(row)
+                for row in values[:page_size]
+            ]
+            return FastJSONRenderer().render(data)
+
+        if model_serializer() != fast_path():
+            raise CommandError("Результаты сериализации не совпадают")
+        repeat = options["repeat"]
+        timings = {}
+        for name, func in [
+            ("ModelSerializer + JSONRenderer", model_serializer),
+            ("values() + FastJSONRenderer", fast_path),
+        ]:
+            timings[name] = min(Timer(func).repeat(5, repeat)) / repeat
+            self.stdout.write(f"{name}: {timings[name] * 1000:.3f} мс")
+        model_time, fast_time = timings.values()
+        self.stdout.write(
+            f"Книг на странице: {len(values[:page_size])}, "
+            f"ускорение: {model_time / fast_time:.1f}x"
+        )
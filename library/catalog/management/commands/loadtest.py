@@ -0,0 +1,108 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест: параллельные GET-запросы к адресам с "
+        "keep-alive соединениями, выводит запросы в секунду и задержки"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "urls",
+            nargs="+",
+            help="Адреса для сравнения, например одной страницы под WSGI и ASGI",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Количество одновременных соединений",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=2000,
+            help="Количество запросов к каждому адресу",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=50,
+            help="Количество запросов для прогрева перед замером",
+        )
+
+    def handle(self, *args, **options) -> None:
+        for url in options["urls"]:
+            parts = urlsplit(url)
+            if parts.scheme != "http" or not parts.hostname:
+                raise CommandError(f"Ожидается адрес http://...: {url}")
+            self.run(parts, 1, options["warmup"])
+            started = time.perf_counter()
+            latencies, errors = self.run(
+                parts, options["concurrency"], options["requests"]
+            )
+            elapsed = time.perf_counter() - started
+            latencies.sort()
+            if not latencies:
+                raise CommandError(f"Нет успешных ответов: {url}")
+            self.stdout.write(
+                f"{url}: {len(latencies) / elapsed:.0f} запросов/с, "
+                f"p50 {self.percentile(latencies, 50) * 1000:.1f} мс, "
+                f"p99 {self.percentile(latencies, 99) * 1000:.1f} мс, "
+                f"ошибок: {errors}"
+            )
+
+    def run(self, parts, concurrency: int, total: int) -> tuple[list, int]:
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+        lock = threading.Lock()
+
+        def worker():
+            nonlocal errors
+            connection = http.client.HTTPConnection(
+                parts.hostname, parts.port or 80, timeout=30
+            )
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    started = time.perf_counter()
+                    try:
+                        connection.request("GET", path)
+                        response = connection.getresponse()
+                        response.read()
+                        ok = response.status == 200
+                    except (OSError, http.client.HTTPException):
+                        connection.close()
+                        ok = False
+                    latency = time.perf_counter() - started
+                    with lock:
+                        if ok:
+                            latencies.append(latency)
+                        else:
+                            errors += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors
+
+    @staticmethod
+    def percentile(values: list[float], percent: int) -> float:
+        index = min(len(values) - 1, round(len(values) * percent / 100))
+        return values[index]
@@ -0,0 +1,25 @@
+from catalog.models import Book
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает количество и сумму оценок книг по таблице рейтинга"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Количество книг, обрабатываемых за один проход",
+        )
+
+    def handle(self, *args, **options) -> None:
+        chunk_size = options["chunk_size"]
+        book_ids = Book.objects.order_by("pk").values_list("pk", flat=True)
+        processed = 0
+        chunk = list(book_ids[:chunk_size])
+        while chunk:
+            Book.rebuild_rating_counters(chunk)
+            processed += len(chunk)
+            chunk = list(book_ids.filter(pk__gt=chunk[-1])[:chunk_size])
+        self.stdout.write(f"Обновлено книг: {processed}")
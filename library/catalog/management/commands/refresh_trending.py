@@ -0,0 +1,49 @@
+import time
+
+from catalog.models import Book, BookTrending
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает популярность оцененных книг для главной страницы"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Количество книг, обрабатываемых за один проход",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help=(
+                "Повторять пересчет каждые INTERVAL секунд "
+                "(0 — пересчитать один раз)"
+            ),
+        )
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            self.refresh(options["chunk_size"])
+            if options["interval"] <= 0:
+                return
+            time.sleep(options["interval"])
+            close_old_connections()
+
+    def refresh(self, chunk_size: int) -> None:
+        book_ids = (
+            Book.objects.filter(rating_count__gt=0)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        processed = 0
+        chunk = list(book_ids[:chunk_size])
+        while chunk:
+            BookTrending.objects.refresh(chunk)
+            processed += len(chunk)
+            chunk = list(book_ids.filter(pk__gt=chunk[-1])[:chunk_size])
+        BookTrending.objects.filter(book__rating_count=0).delete()
+        self.stdout.write(f"Обновлено книг: {processed}")
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.6 on 2023-10-09 22:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    # Заменяет 0001_initial без расширения pg_trgm и триграммных
+    # GIN-индексов: в SQLite их создать нельзя, а в PostgreSQL их создает
+    # 0011_trigram_indexes. В базах, где 0001_initial уже применена, эта
+    # миграция считается примененной.
+    replaces = [
+        ('catalog', '0001_initial'),
+    ]
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Author',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Имя')),
+                ('date_of_birth', models.DateField(default=django.utils.timezone.now, verbose_name='Дата рождения')),
+                ('bio', models.TextField(max_length=1000, verbose_name='Краткая биография')),
+                ('photo', models.ImageField(default='authors/no-photo.webp', upload_to='authors/', verbose_name='Фотография')),
+            ],
+            options={
+                'verbose_name': 'Автор',
+                'verbose_name_plural': 'Авторы',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Book',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Название')),
+                ('summary', models.TextField(max_length=1000, verbose_name='Краткое описание')),
+                ('publication_year', models.PositiveSmallIntegerField(default=2023, verbose_name='Год издания')),
+                ('poster', models.ImageField(default='posters/no-poster.jpg', upload_to='posters/', verbose_name='Обложка')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='books', to='catalog.author', verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Книга',
+                'verbose_name_plural': 'Книги',
+                'ordering': ['title', 'author__name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookComment',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField(max_length=1000, verbose_name='Содержание')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата публикации')),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='catalog.book', verbose_name='Книга')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Комментарий',
+                'verbose_name_plural': 'Комментарии',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.CheckConstraint(check=models.Q(('publication_year__gte', 0), ('publication_year__lte', 2999)), name='publication_year_gte_0_lte_2999', violation_error_message='Год публикации должен быть в интервале от 0 до 2999'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.6 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+def fill_rating_counters(apps, schema_editor):
+    Book = apps.get_model("catalog", "Book")
+    BookRating = apps.get_model("catalog", "BookRating")
+    totals = (
+        BookRating.objects.values("book")
+        .annotate(count=models.Count("id"), sum=models.Sum("rate"))
+        .order_by()
+    )
+    for row in totals.iterator():
+        Book.objects.filter(pk=row["book"]).update(
+            rating_count=row["count"], rating_sum=row["sum"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_bookrating_bookrating_book_rate_gte_1_lte_5_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.6 on 2026-10-18 02:22
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+# Оценки до миграции получают время заведомо за пределами окон недавней
+# активности, иначе сразу после обновления вся история считалась бы
+# недавней.
+LEGACY_RATED_AT = datetime.datetime(
+    2000, 1, 1, tzinfo=datetime.timezone.utc
+)
+
+# Параметры популярности на момент миграции (TRENDING_* в настройках).
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 10
+
+
+def fill_trending(apps, schema_editor):
+    BookRating = apps.get_model("catalog", "BookRating")
+    BookTrending = apps.get_model("catalog", "BookTrending")
+    totals = (
+        BookRating.objects.values("book")
+        .annotate(count=models.Count("id"), sum=models.Sum("rate"))
+        .order_by()
+    )
+    now = timezone.now()
+    rows = []
+    for row in totals.iterator():
+        bayesian_rating = (PRIOR_MEAN * PRIOR_WEIGHT + row["sum"]) / (
+            PRIOR_WEIGHT + row["count"]
+        )
+        rows.append(
+            BookTrending(
+                book_id=row["book"],
+                bayesian_rating=bayesian_rating,
+                recent_activity=0,
+                score=bayesian_rating,
+                updated_at=now,
+            )
+        )
+    BookTrending.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_book_rating_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookTrending',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='catalog.book', verbose_name='Книга')),
+                ('bayesian_rating', models.FloatField(verbose_name='Байесовская оценка')),
+                ('recent_activity', models.FloatField(verbose_name='Недавняя активность')),
+                ('score', models.FloatField(verbose_name='Популярность')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата расчета')),
+            ],
+            options={
+                'verbose_name': 'Популярная книга',
+                'verbose_name_plural': 'Популярные книги',
+                'ordering': ['-score', 'book_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='bookrating',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=LEGACY_RATED_AT, verbose_name='Дата оценки'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='bookrating',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=LEGACY_RATED_AT, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='bookrating',
+            index=models.Index(fields=['book', 'updated_at'], name='bookrating_book_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booktrending',
+            index=models.Index(fields=['-score', 'book'], name='booktrending_score_idx'),
+        ),
+        migrations.RunPython(fill_trending, migrations.RunPython.noop),
+    ]
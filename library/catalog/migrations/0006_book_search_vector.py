@@ -0,0 +1,68 @@
+# Generated by Django 4.2.6 on 2026-10-18 02:31
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Конфигурация поиска на момент миграции (SEARCH_CONFIG в настройках): при
+# ее изменении векторы пересчитывает новая миграция, а не эта.
+SEARCH_CONFIG = "russian"
+
+
+def fill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Author = apps.get_model("catalog", "Author")
+    Book = apps.get_model("catalog", "Book")
+    author_name = models.Subquery(
+        Author.objects.filter(pk=models.OuterRef("author_id")).values("name")[:1]
+    )
+    config = SEARCH_CONFIG
+    Book.objects.update(
+        search_vector=django.contrib.postgres.search.SearchVector(
+            "title", weight="A", config=config
+        )
+        + django.contrib.postgres.search.SearchVector(
+            author_name, weight="B", config=config
+        )
+        + django.contrib.postgres.search.SearchVector(
+            "summary", weight="C", config=config
+        )
+    )
+
+
+# Индекс создается только в PostgreSQL и не входит в состояние моделей:
+# иначе SQLite создал бы его при пересоздании таблицы книг в следующих
+# миграциях.
+CREATE_SEARCH_INDEX = """
+    CREATE INDEX IF NOT EXISTS book_search_vector_idx
+    ON catalog_book USING gin (search_vector)
+"""
+
+DROP_SEARCH_INDEX = "DROP INDEX IF EXISTS book_search_vector_idx"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_bookrating_timestamps_booktrending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,171 @@
+# Generated by Django 4.2.6 on 2026-10-18 02:36
+
+import catalog.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE TABLE catalog_book_search (
+        id integer NOT NULL PRIMARY KEY AUTOINCREMENT,
+        book_id char(32) NOT NULL UNIQUE,
+        title text NOT NULL,
+        author text NOT NULL,
+        summary text NOT NULL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE catalog_book_fts USING fts5(
+        book_id UNINDEXED,
+        title,
+        author,
+        summary,
+        content = 'catalog_book_search',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO catalog_book_fts (catalog_book_fts, rank)
+    VALUES ('rank', 'bm25(0.0, 5.0, 2.0, 1.0)')
+    """,
+    """
+    CREATE TRIGGER catalog_book_search_insert
+    AFTER INSERT ON catalog_book_search BEGIN
+        INSERT INTO catalog_book_fts (rowid, book_id, title, author, summary)
+        VALUES (new.id, new.book_id, new.title, new.author, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_book_search_delete
+    AFTER DELETE ON catalog_book_search BEGIN
+        INSERT INTO catalog_book_fts (
+            catalog_book_fts, rowid, book_id, title, author, summary
+        )
+        VALUES (
+            'delete', old.id, old.book_id, old.title, old.author, old.summary
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_book_search_update
+    AFTER UPDATE ON catalog_book_search BEGIN
+        INSERT INTO catalog_book_fts (
+            catalog_book_fts, rowid, book_id, title, author, summary
+        )
+        VALUES (
+            'delete', old.id, old.book_id, old.title, old.author, old.summary
+        );
+        INSERT INTO catalog_book_fts (rowid, book_id, title, author, summary)
+        VALUES (new.id, new.book_id, new.title, new.author, new.summary);
+    END
+    """,
+]
+
+SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_insert
+    AFTER INSERT ON catalog_book BEGIN
+        INSERT INTO catalog_book_search (book_id, title, author, summary)
+        SELECT new.id, new.title, catalog_author.name, new.summary
+        FROM catalog_author
+        WHERE catalog_author.id = new.author_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_update
+    AFTER UPDATE OF title, author_id, summary ON catalog_book
+    WHEN old.title IS NOT new.title
+        OR old.author_id IS NOT new.author_id
+        OR old.summary IS NOT new.summary
+    BEGIN
+        UPDATE catalog_book_search
+        SET title = new.title,
+            author = (
+                SELECT name FROM catalog_author WHERE id = new.author_id
+            ),
+            summary = new.summary
+        WHERE book_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_delete
+    AFTER DELETE ON catalog_book BEGIN
+        DELETE FROM catalog_book_search WHERE book_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_author_fts_update
+    AFTER UPDATE OF name ON catalog_author
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE catalog_book_search
+        SET author = new.name
+        WHERE book_id IN (
+            SELECT id FROM catalog_book WHERE author_id = new.id
+        );
+    END
+    """,
+]
+
+FILL_SEARCH_INDEX = """
+    INSERT INTO catalog_book_search (book_id, title, author, summary)
+    SELECT catalog_book.id, catalog_book.title, catalog_author.name,
+        catalog_book.summary
+    FROM catalog_book
+    INNER JOIN catalog_author ON catalog_author.id = catalog_book.author_id
+"""
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER catalog_author_fts_update",
+    "DROP TRIGGER catalog_book_fts_delete",
+    "DROP TRIGGER catalog_book_fts_update",
+    "DROP TRIGGER catalog_book_fts_insert",
+    "DROP TABLE catalog_book_fts",
+    "DROP TABLE catalog_book_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+    for statement in SEARCH_TRIGGERS:
+        schema_editor.execute(statement)
+    schema_editor.execute(FILL_SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_book_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchIndex',
+            fields=[
+                ('book', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='catalog.book', verbose_name='Книга')),
+                ('title', models.TextField(verbose_name='Название')),
+                ('author', models.TextField(verbose_name='Автор')),
+                ('summary', models.TextField(verbose_name='Краткое описание')),
+                ('document', catalog.models.FTS5TableField(db_column='catalog_book_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'Поисковый индекс книги',
+                'verbose_name_plural': 'Поисковый индекс книг',
+                'db_table': 'catalog_book_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
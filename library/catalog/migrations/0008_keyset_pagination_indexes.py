@@ -0,0 +1,29 @@
+# Generated by Django 4.2.6 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_book_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name', 'id'], name='author_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'title', 'id'], name='book_author_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookcomment',
+            index=models.Index(fields=['book', '-created_at', 'id'], name='bookcomment_book_created_idx'),
+        ),
+    ]
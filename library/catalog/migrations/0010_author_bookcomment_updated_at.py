@@ -0,0 +1,93 @@
+# Generated by Django 4.2.6 on 2026-10-18 04:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_insert
+    AFTER INSERT ON catalog_book BEGIN
+        INSERT INTO catalog_book_search (book_id, title, author, summary)
+        SELECT new.id, new.title, catalog_author.name, new.summary
+        FROM catalog_author
+        WHERE catalog_author.id = new.author_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_update
+    AFTER UPDATE OF title, author_id, summary ON catalog_book
+    WHEN old.title IS NOT new.title
+        OR old.author_id IS NOT new.author_id
+        OR old.summary IS NOT new.summary
+    BEGIN
+        UPDATE catalog_book_search
+        SET title = new.title,
+            author = (
+                SELECT name FROM catalog_author WHERE id = new.author_id
+            ),
+            summary = new.summary
+        WHERE book_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_delete
+    AFTER DELETE ON catalog_book BEGIN
+        DELETE FROM catalog_book_search WHERE book_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_author_fts_update
+    AFTER UPDATE OF name ON catalog_author
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE catalog_book_search
+        SET author = new.name
+        WHERE book_id IN (
+            SELECT id FROM catalog_book WHERE author_id = new.id
+        );
+    END
+    """,
+]
+
+DROP_SEARCH_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS catalog_book_fts_insert",
+    "DROP TRIGGER IF EXISTS catalog_book_fts_update",
+    "DROP TRIGGER IF EXISTS catalog_book_fts_delete",
+    "DROP TRIGGER IF EXISTS catalog_author_fts_update",
+]
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in DROP_SEARCH_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+def install_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SEARCH_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, install_search_triggers),
+        migrations.AddField(
+            model_name='author',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='bookcomment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(install_search_triggers, drop_search_triggers),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Расширение pg_trgm и триграммные индексы нужны только PostgreSQL. Они не
+# входят в состояние моделей, чтобы SQLite не создавал их при пересоздании
+# таблиц. IF NOT EXISTS: в базах, созданных до этой миграции, они уже есть.
+CREATE_TRIGRAM_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS author_name_upper_gin_idx
+    ON catalog_author USING gin (UPPER(name) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS book_title_upper_gin_idx
+    ON catalog_book USING gin (UPPER(title) gin_trgm_ops)
+    """,
+]
+
+DROP_TRIGRAM_INDEXES = [
+    "DROP INDEX IF EXISTS book_title_upper_gin_idx",
+    "DROP INDEX IF EXISTS author_name_upper_gin_idx",
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in CREATE_TRIGRAM_INDEXES:
+        schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP_TRIGRAM_INDEXES:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_author_bookcomment_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
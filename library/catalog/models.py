@@ -1,16 +1,41 @@
+import math
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.indexes import GinIndex
-from django.db import IntegrityError, models
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import IntegrityError, connections, models, router, transaction
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from django.utils import timezone
 from django.utils.timezone import now
 
+from . import caching
+from .querycache import CachedManager, CachedQuerySet, invalidate_rows
+
 User = get_user_model()
 
 
+class FTS5TableField(models.TextField):
+    """Скрытый столбец виртуальной таблицы FTS5 с именем самой таблицы.
+
+    К нему применяется оператор MATCH, и он же передается первым аргументом
+    во вспомогательные функции FTS5: highlight(), snippet() и bm25().
+    """
+
+
+@FTS5TableField.register_lookup
+class FTS5Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
 class UpperGinIndex(GinIndex):
     def create_sql(self, model, schema_editor, using="", *args, **kwargs):
         statement = super().create_sql(
@@ -25,6 +50,15 @@ class UpperGinIndex(GinIndex):
         return statement
 
 
+class AuthorQuerySet(CachedQuerySet):
+    def cards(self):
+        """Только поля, которые выводятся в карточке автора в списках.
+
+        Дата изменения входит в ключ кэша карточки.
+        """
+        return self.only("id", "name", "photo", "updated_at")
+
+
 class Author(models.Model):
     id = models.UUIDField(
         verbose_name="ID", primary_key=True, default=uuid.uuid4
@@ -51,22 +85,33 @@ class Author(models.Model):
         null=False,
         default="authors/no-photo.webp",
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+    )
+
+    objects = AuthorQuerySet.as_manager()
 
     class Meta:
         ordering = ["name"]
         verbose_name = "Автор"
         verbose_name_plural = "Авторы"
+        # Триграммный GIN-индекс author_name_upper_gin_idx по UPPER(name)
+        # создается миграцией только в PostgreSQL.
         indexes = [
-            UpperGinIndex(
-                fields=["name"],
-                name="author_name_upper_gin_idx",
-                opclasses=["gin_trgm_ops"],
-            ),
+            models.Index(fields=["name", "id"], name="author_name_id_idx"),
         ]
 
     def get_absolute_url(self) -> str:
         return reverse("author-detail", args=[str(self.id)])
 
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+        changes = {"updated_at": timezone.now()}
+        if connections[self._state.db].vendor == "postgresql":
+            changes["search_vector"] = Book.search_vector_expression()
+        self.books.update(**changes)
+
     def __str__(self) -> str:
         return self.name
 
@@ -83,6 +128,19 @@ class Author(models.Model):
     preview.short_description = "Предпросмотр"
 
 
+class BookQuerySet(CachedQuerySet):
+    def cards(self):
+        """Только поля, которые выводятся в карточке книги в списках.
+
+        Описание, поисковый вектор и счетчики не загружаются, а имя автора
+        выбирается тем же запросом. Дата изменения входит в ключ кэша
+        карточки.
+        """
+        return self.select_related("author").only(
+            "id", "title", "poster", "updated_at", "author__id", "author__name"
+        )
+
+
 class Book(models.Model):
     id = models.UUIDField(
         verbose_name="ID", primary_key=True, default=uuid.uuid4
@@ -124,6 +182,21 @@ class Book(models.Model):
         blank=True,
         null=True,
     )
+    rating_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок", default=0, editable=False
+    )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок", default=0, editable=False
+    )
+    search_vector = SearchVectorField(
+        verbose_name="Поисковый вектор", null=True, editable=False
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+    )
+
+    objects = BookQuerySet.as_manager()
 
     class Meta:
         ordering = ["title", "author__name"]
@@ -138,17 +211,51 @@ class Book(models.Model):
                 violation_error_message="Год публикации должен быть в интервале от 0 до 2999",
             ),
         ]
+        # GIN-индексы book_title_upper_gin_idx по UPPER(title) и
+        # book_search_vector_idx создаются миграциями только в PostgreSQL.
         indexes = [
-            UpperGinIndex(
-                fields=["title"],
-                name="book_title_upper_gin_idx",
-                opclasses=["gin_trgm_ops"],
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+            models.Index(
+                fields=["author", "title", "id"],
+                name="book_author_title_id_idx",
+            ),
+            models.Index(
+                fields=["updated_at", "id"], name="book_updated_id_idx"
             ),
         ]
 
     def get_absolute_url(self) -> str:
         return reverse("book-detail", args=[str(self.id)])
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        book = super().from_db(db, field_names, values)
+        # Автор на момент загрузки: при переносе книги к другому автору
+        # сигналы сбрасывают кэш страниц обоих авторов.
+        book._loaded_author_id = book.__dict__.get("author_id")
+        return book
+
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+        if connections[self._state.db].vendor == "postgresql":
+            Book.objects.filter(pk=self.pk).update(
+                search_vector=Book.search_vector_expression()
+            )
+
+    @staticmethod
+    def search_vector_expression():
+        author_name = models.Subquery(
+            Author.objects.filter(pk=models.OuterRef("author_id")).values(
+                "name"
+            )[:1]
+        )
+        config = settings.SEARCH_CONFIG
+        return (
+            SearchVector("title", weight="A", config=config)
+            + SearchVector(author_name, weight="B", config=config)
+            + SearchVector("summary", weight="C", config=config)
+        )
+
     def __str__(self) -> str:
         return f"{self.title}"
 
@@ -166,7 +273,76 @@ class Book(models.Model):
 
     @property
     def average_rating(self):
-        return self.rating.all().aggregate(models.Avg("rate"))["rate__avg"]
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @classmethod
+    def update_rating_counters(cls, book_id, count_delta, sum_delta) -> None:
+        cls.objects.filter(pk=book_id).update(
+            rating_count=models.F("rating_count") + count_delta,
+            rating_sum=models.F("rating_sum") + sum_delta,
+            updated_at=timezone.now(),
+        )
+        caching.invalidate(f"book:{book_id}")
+
+    @classmethod
+    def touch(cls, *book_ids) -> None:
+        cls.objects.filter(pk__in=book_ids).update(updated_at=timezone.now())
+        caching.invalidate(*(f"book:{book_id}" for book_id in book_ids))
+
+    @classmethod
+    def rebuild_rating_counters(cls, book_ids) -> None:
+        with transaction.atomic():
+            books = list(
+                cls.objects.select_for_update()
+                .filter(pk__in=book_ids)
+                .only("id")
+                .order_by("pk")
+            )
+            totals = {
+                row["book"]: row
+                for row in BookRating.objects.filter(book__in=book_ids)
+                .values("book")
+                .annotate(count=models.Count("id"), sum=models.Sum("rate"))
+                .order_by()
+            }
+            for book in books:
+                row = totals.get(book.id, {"count": 0, "sum": 0})
+                book.rating_count = row["count"]
+                book.rating_sum = row["sum"]
+            cls.objects.bulk_update(books, ["rating_count", "rating_sum"])
+        caching.invalidate(*(f"book:{book.pk}" for book in books))
+
+
+class BookSearchIndex(models.Model):
+    """Полнотекстовый индекс книг FTS5 для SQLite.
+
+    Виртуальная таблица создается миграцией только в SQLite и заполняется
+    триггерами при изменении книг и авторов, поэтому модель не управляет
+    схемой. Столбец ``rank`` вычисляет bm25() с весами, заданными при
+    создании таблицы.
+    """
+
+    book = models.OneToOneField(
+        Book,
+        verbose_name="Книга",
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="search_index",
+    )
+    title = models.TextField(verbose_name="Название")
+    author = models.TextField(verbose_name="Автор")
+    summary = models.TextField(verbose_name="Краткое описание")
+    document = FTS5TableField(db_column="catalog_book_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "catalog_book_fts"
+        verbose_name = "Поисковый индекс книги"
+        verbose_name_plural = "Поисковый индекс книг"
 
 
 class BookComment(models.Model):
@@ -195,16 +371,157 @@ class BookComment(models.Model):
         verbose_name="Дата публикации",
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+    )
+
+    objects = CachedManager()
 
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["book", "-created_at", "id"],
+                name="bookcomment_book_created_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Комментарий пользователя {self.user.username} на книгу {self.book.title}"
 
 
+class BookRatingManager(CachedManager):
+    def upsert(self, book, user, rate):
+        """Ставит или меняет оценку одним запросом INSERT ... ON CONFLICT.
+
+        Возвращает сохраненную оценку и предыдущее значение (None, если
+        пользователь оценивает книгу впервые).
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        created_at_field = self.model._meta.get_field("created_at")
+        now = timezone.now()
+        book_id = Book._meta.pk.get_db_prep_value(book.pk, connection)
+        timestamp = created_at_field.get_db_prep_value(now, connection)
+        with transaction.atomic(using=self.db):
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute(
+                        f"""
+                        WITH previous AS (
+                            SELECT rate FROM {table}
+                            WHERE book_id = %s AND user_id = %s
+                            FOR UPDATE
+                        ), upserted AS (
+                            INSERT INTO {table}
+                                (book_id, user_id, rate, created_at, updated_at)
+                            SELECT %s, %s, %s, %s, %s
+                            FROM (SELECT COUNT(*) FROM previous) AS locked
+                            WHERE TRUE
+                            ON CONFLICT (book_id, user_id)
+                            DO UPDATE SET
+                                rate = EXCLUDED.rate,
+                                updated_at = EXCLUDED.updated_at
+                            RETURNING id, created_at, xmax = 0 AS inserted
+                        )
+                        SELECT
+                            id, created_at, (SELECT rate FROM previous), inserted
+                        FROM upserted
+                        """,
+                        [
+                            book_id,
+                            user.pk,
+                            book_id,
+                            user.pk,
+                            rate,
+                            timestamp,
+                            timestamp,
+                        ],
+                    )
+                    pk, created_at, previous_rate, inserted = cursor.fetchone()
+                else:
+                    cursor.execute(
+                        f"SELECT rate FROM {table} "
+                        "WHERE book_id = %s AND user_id = %s",
+                        [book_id, user.pk],
+                    )
+                    row = cursor.fetchone()
+                    previous_rate = row[0] if row else None
+                    cursor.execute(
+                        f"""
+                        INSERT INTO {table}
+                            (book_id, user_id, rate, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, %s)
+                        ON CONFLICT (book_id, user_id)
+                        DO UPDATE SET
+                            rate = excluded.rate,
+                            updated_at = excluded.updated_at
+                        RETURNING id, created_at
+                        """,
+                        [book_id, user.pk, rate, timestamp, timestamp],
+                    )
+                    pk, created_at = cursor.fetchone()
+                    inserted = previous_rate is None
+            invalidate_rows(self.model, [pk])
+            column = created_at_field.get_col(self.model._meta.db_table)
+            for converter in connection.ops.get_db_converters(
+                column
+            ) + created_at_field.get_db_converters(connection):
+                created_at = converter(created_at, column, connection)
+            if inserted:
+                Book.update_rating_counters(book.pk, 1, rate)
+            elif previous_rate is not None:
+                Book.update_rating_counters(book.pk, 0, rate - previous_rate)
+            else:
+                # Оценку параллельно вставила другая транзакция, прежнее
+                # значение неизвестно, поэтому счетчики пересчитываются.
+                Book.rebuild_rating_counters([book.pk])
+            BookTrending.objects.refresh([book.pk])
+        rating = self.model(
+            pk=pk,
+            book=book,
+            user=user,
+            rate=rate,
+            created_at=created_at,
+            updated_at=now,
+        )
+        rating._state.adding = False
+        rating._state.db = self.db
+        return rating, previous_rate
+
+    def bulk_upsert(self, user, rates: dict) -> dict:
+        """Ставит или меняет оценки пользователя сразу для многих книг.
+
+        ``rates`` сопоставляет идентификатор книги с оценкой. Оценки
+        записываются одним INSERT ... ON CONFLICT на пачку, затем счетчики
+        и популярность книг пересчитываются по таблице рейтинга.
+        Возвращает идентификаторы книг, которые пользователь уже оценивал.
+        """
+        book_ids = list(rates)
+        with transaction.atomic(using=self.db):
+            previous = set(
+                self.select_for_update()
+                .filter(user=user, book__in=book_ids)
+                .values_list("book_id", flat=True)
+            )
+            self.bulk_create(
+                [
+                    self.model(book_id=book_id, user=user, rate=rate)
+                    for book_id, rate in rates.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["book", "user"],
+                update_fields=["rate", "updated_at"],
+            )
+            Book.rebuild_rating_counters(book_ids)
+            Book.touch(*book_ids)
+            BookTrending.objects.refresh(book_ids)
+        return previous
+
+
 class BookRating(models.Model):
     BAD = 1
     POOR = 2
@@ -231,11 +548,27 @@ class BookRating(models.Model):
         blank=False,
         null=False,
     )
+    created_at = models.DateTimeField(
+        verbose_name="Дата оценки",
+        auto_now_add=True,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+    )
+
+    objects = BookRatingManager()
 
     class Meta:
         verbose_name = "Рейтинг"
         verbose_name_plural = "Рейтинг"
         unique_together = ["book", "user"]
+        indexes = [
+            models.Index(
+                fields=["book", "updated_at"],
+                name="bookrating_book_updated_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(rate__gte=1, rate__lte=5),
@@ -248,11 +581,141 @@ class BookRating(models.Model):
         return f"Оценка пользователя {self.user.username} на книгу {self.book.title}"
 
     def save(self, *args, **kwargs) -> None:
-        try:
-            super().save(*args, **kwargs)
-        except IntegrityError:
-            existing_record = BookRating.objects.get(
-                models.Q(user=self.user) & models.Q(book=self.book)
+        """Сохраняет оценку и обновляет счетчики и популярность книги.
+
+        Повторная оценка книги тем же пользователем меняет его прежнюю
+        оценку. Представления ставят оценки через BookRatingManager.upsert().
+        """
+        using = kwargs.get("using") or router.db_for_write(
+            BookRating, instance=self
+        )
+        with transaction.atomic(using=using):
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    BookRating.objects.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values("book_id", "rate")
+                    .first()
+                )
+            try:
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+            except IntegrityError:
+                if previous is not None:
+                    raise
+                existing_record = BookRating.objects.using(using).get(
+                    book=self.book, user=self.user
+                )
+                existing_record.rate = self.rate
+                existing_record.save(using=using)
+                self.pk = existing_record.pk
+                self.created_at = existing_record.created_at
+                self.updated_at = existing_record.updated_at
+                self._state.adding = False
+                self._state.db = using
+                return
+            book_ids = {self.book_id}
+            if previous is not None:
+                Book.update_rating_counters(
+                    previous["book_id"], -1, -previous["rate"]
+                )
+                book_ids.add(previous["book_id"])
+            Book.update_rating_counters(self.book_id, 1, self.rate)
+            BookTrending.objects.refresh(book_ids)
+
+
+class BookTrendingManager(models.Manager):
+    def refresh(self, book_ids) -> None:
+        """Пересчитывает популярность книг и обновляет их строки в рейтинге.
+
+        Популярность — байесовское среднее оценок книги, к которому
+        добавляется логарифм взвешенного числа оценок за последние дни.
+        Книги без оценок из рейтинга удаляются.
+        """
+        current_time = timezone.now()
+        windows = {
+            f"window_{days}": models.Count(
+                "id",
+                filter=models.Q(
+                    updated_at__gte=current_time - timedelta(days=days)
+                ),
+            )
+            for days in settings.TRENDING_WINDOWS
+        }
+        recent = {
+            row["book"]: row
+            for row in BookRating.objects.filter(book__in=book_ids)
+            .values("book")
+            .annotate(**windows)
+            .order_by()
+        }
+        rows = []
+        for book in Book.objects.filter(
+            pk__in=book_ids, rating_count__gt=0
+        ).values("id", "rating_count", "rating_sum"):
+            bayesian_rating = (
+                settings.TRENDING_PRIOR_MEAN * settings.TRENDING_PRIOR_WEIGHT
+                + book["rating_sum"]
+            ) / (settings.TRENDING_PRIOR_WEIGHT + book["rating_count"])
+            recent_activity = sum(
+                weight * recent.get(book["id"], {}).get(f"window_{days}", 0)
+                for days, weight in settings.TRENDING_WINDOWS.items()
+            )
+            rows.append(
+                self.model(
+                    book_id=book["id"],
+                    bayesian_rating=bayesian_rating,
+                    recent_activity=recent_activity,
+                    score=bayesian_rating
+                    + settings.TRENDING_ACTIVITY_WEIGHT
+                    * math.log1p(recent_activity),
+                    updated_at=current_time,
+                )
+            )
+        with transaction.atomic(using=self.db):
+            self.filter(book__in=book_ids).exclude(
+                book__in=[row.book_id for row in rows]
+            ).delete()
+            self.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["book"],
+                update_fields=[
+                    "bayesian_rating",
+                    "recent_activity",
+                    "score",
+                    "updated_at",
+                ],
             )
-            existing_record.rate = self.rate
-            existing_record.save()
+        caching.invalidate("trending")
+
+
+class BookTrending(models.Model):
+    book = models.OneToOneField(
+        Book,
+        verbose_name="Книга",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="trending",
+    )
+    bayesian_rating = models.FloatField(verbose_name="Байесовская оценка")
+    recent_activity = models.FloatField(verbose_name="Недавняя активность")
+    score = models.FloatField(verbose_name="Популярность")
+    updated_at = models.DateTimeField(verbose_name="Дата расчета")
+
+    objects = BookTrendingManager()
+
+    class Meta:
+        ordering = ["-score", "book_id"]
+        verbose_name = "Популярная книга"
+        verbose_name_plural = "Популярные книги"
+        indexes = [
+            models.Index(
+                fields=["-score", "book"], name="booktrending_score_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Популярность книги {self.book.title}"
@@ -0,0 +1,450 @@
+import base64
+import binascii
+import json
+from datetime import date
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """Оценка количества строк выборки по статистике планировщика PostgreSQL.
+
+    Для выборки без условий берется ``pg_class.reltuples`` таблицы, для
+    остальных — оценка числа строк из EXPLAIN. Возвращает None, если
+    оценка недоступна: другая СУБД или таблица еще не анализировалась.
+    """
+    connection = connections[queryset.db]
+    query = queryset.query
+    if connection.vendor != "postgresql" or query.is_empty():
+        return None
+    if not query.where and not query.distinct and not query.combinator:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который не считает строки больших выборок.
+
+    Если оценка планировщика не меньше PAGINATION_ESTIMATE_THRESHOLD,
+    количество записей берется из нее без SELECT COUNT(*); для небольших
+    выборок и СУБД без статистики считается точно.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._estimate()
+        if estimate is not None:
+            return estimate
+        return super().count
+
+    async def acount(self) -> int:
+        """Асинхронный вариант count, результат запоминается и для него."""
+        if "count" not in self.__dict__:
+            estimate = await sync_to_async(self._estimate)()
+            if estimate is not None:
+                self.count = estimate
+            elif isinstance(self.object_list, QuerySet):
+                self.count = await self.object_list.acount()
+        return self.count
+
+    def _estimate(self) -> int | None:
+        if not isinstance(self.object_list, QuerySet):
+            return None
+        estimate = estimate_count(self.object_list)
+        if (
+            estimate is not None
+            and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD
+        ):
+            return estimate
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу сортировки вместо OFFSET и COUNT(*).
+
+    Курсор хранит значения полей сортировки последней (или первой, для
+    перехода назад) записи страницы, и следующая страница выбирается
+    условием «строго после этих значений». Последним полем сортировки
+    должен быть уникальный ключ, например ``id``, иначе записи с
+    одинаковыми значениями могут пропадать между страницами.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [
+            self._resolve_field(name.lstrip("-")) for name in self.ordering
+        ]
+
+    def ordered(self, reverse: bool = False) -> QuerySet:
+        return self.queryset.order_by(
+            *(
+                (
+                    f"-{name.lstrip('-')}"
+                    if name.startswith("-") != reverse
+                    else name.lstrip("-")
+                )
+                for name in self.ordering
+            )
+        )
+
+    def page(self, cursor: str | None) -> KeysetPage:
+        queryset, values, reverse = self._page_queryset(cursor)
+        return self._page(list(queryset), values, reverse)
+
+    async def apage(self, cursor: str | None) -> KeysetPage:
+        queryset, values, reverse = self._page_queryset(cursor)
+        return self._page([obj async for obj in queryset], values, reverse)
+
+    def _page_queryset(
+        self, cursor: str | None
+    ) -> tuple[QuerySet, list, bool]:
+        if not cursor:
+            values, reverse = None, False
+        else:
+            values, reverse = self.decode_cursor(cursor)
+        queryset = self.ordered(reverse)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+        return queryset[: self.per_page + 1], values, reverse
+
+    def _page(self, object_list: list, values, reverse: bool) -> KeysetPage:
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if reverse:
+            object_list.reverse()
+        has_next = has_more if not reverse else values is not None
+        has_previous = values is not None if not reverse else has_more
+        return KeysetPage(
+            object_list,
+            next_cursor=(
+                self.encode_cursor(object_list[-1])
+                if has_next and object_list
+                else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(object_list[0], reverse=True)
+                if has_previous and object_list
+                else None
+            ),
+        )
+
+    def encode_cursor(self, obj, reverse: bool = False) -> str:
+        values = [
+            self._dump(self._value(obj, name.lstrip("-")))
+            for name in self.ordering
+        ]
+        data = json.dumps([int(reverse), values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[list, bool]:
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            reverse, values = json.loads(data)
+            if len(values) != len(self.ordering):
+                raise InvalidCursor
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ], bool(reverse)
+        except (
+            binascii.Error,
+            UnicodeDecodeError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ) as error:
+            raise InvalidCursor from error
+
+    def _after(self, values, reverse: bool) -> Q:
+        """Условие «после курсора» для сортировки по нескольким полям.
+
+        К цепочке ``a > x OR (a = x AND b > y) ...`` добавляется условие
+        ``a >= x`` по первому полю, чтобы индекс по нему ограничивал
+        диапазон чтения.
+        """
+        condition = None
+        for name, value in reversed(list(zip(self.ordering, values))):
+            lookup = "lt" if name.startswith("-") != reverse else "gt"
+            field = name.lstrip("-")
+            after = Q(**{f"{field}__{lookup}": value})
+            if condition is not None:
+                after |= Q(**{field: value}) & condition
+            condition = after
+        first = self.ordering[0]
+        lookup = "lte" if first.startswith("-") != reverse else "gte"
+        return Q(**{f"{first.lstrip('-')}__{lookup}": values[0]}) & condition
+
+    def _resolve_field(self, name: str):
+        model = self.queryset.model
+        *relations, attname = name.split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        if attname == "pk":
+            return model._meta.pk
+        return model._meta.get_field(attname)
+
+    @staticmethod
+    def _value(obj, name: str):
+        if isinstance(obj, dict):
+            return obj[name]
+        for attname in name.split("__"):
+            obj = getattr(obj, attname)
+        return obj
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+
+class AsyncPaginationMixin:
+    """Асинхронный вариант paginate_queryset() для списков на базе ListView.
+
+    Количество записей и страница выбираются асинхронным ORM, поэтому
+    paginator_class должен поддерживать acount(), как
+    EstimatedCountPaginator.
+    """
+
+    async def apaginate_queryset(self, queryset: QuerySet, page_size: int):
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        await paginator.acount()
+        page_kwarg = self.page_kwarg
+        page = (
+            self.kwargs.get(page_kwarg)
+            or self.request.GET.get(page_kwarg)
+            or 1
+        )
+        try:
+            page_number = int(page)
+        except ValueError:
+            if page != "last":
+                raise Http404(
+                    _("Page is not “last”, nor can it be converted to an int.")
+                )
+            page_number = paginator.num_pages
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage as error:
+            raise Http404(
+                _("Invalid page (%(page_number)s): %(message)s")
+                % {"page_number": page_number, "message": str(error)}
+            )
+        page.object_list = [obj async for obj in page.object_list]
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class KeysetPaginationMixin(AsyncPaginationMixin):
+    """Курсорный режим постраничного вывода для списков на базе ListView.
+
+    Без параметра ``cursor`` работает обычная постраничная навигация, но
+    ссылка «Далее» ведет в курсорный режим, где следующие страницы
+    выбираются без OFFSET и без подсчета общего количества.
+    """
+
+    keyset_ordering = None
+    cursor_kwarg = "cursor"
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int):
+        paginator = KeysetPaginator(
+            queryset, page_size, self.get_keyset_ordering()
+        )
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            django_paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(paginator.ordered(), page_size)
+            )
+            page.object_list = list(object_list)
+            return self._link_cursor_mode(
+                paginator, django_paginator, page, is_paginated
+            )
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404("Некорректный курсор")
+        return None, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset: QuerySet, page_size: int):
+        paginator = KeysetPaginator(
+            queryset, page_size, self.get_keyset_ordering()
+        )
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            django_paginator, page, object_list, is_paginated = (
+                await super().apaginate_queryset(
+                    paginator.ordered(), page_size
+                )
+            )
+            return self._link_cursor_mode(
+                paginator, django_paginator, page, is_paginated
+            )
+        try:
+            page = await paginator.apage(cursor)
+        except InvalidCursor:
+            raise Http404("Некорректный курсор")
+        return None, page, page.object_list, page.has_other_pages()
+
+    def _link_cursor_mode(
+        self, paginator, django_paginator, page, is_paginated
+    ):
+        page.next_cursor = (
+            paginator.encode_cursor(page.object_list[-1])
+            if page.has_next()
+            else None
+        )
+        return django_paginator, page, page.object_list, is_paginated
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 6
+    page_size_query_param = "page_size"
+    max_page_size = 20
+
+
+class KeysetResultsSetPagination(StandardResultsSetPagination):
+    """Постраничный вывод API с курсорным режимом по параметру ``cursor``.
+
+    В курсорном режиме ответ содержит только ссылки ``next`` и
+    ``previous`` без общего количества записей.
+    """
+
+    cursor_query_param = "cursor"
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator, cursor = self._keyset_paginator(queryset, request, view)
+        if cursor is None:
+            return super().paginate_queryset(
+                paginator.ordered(), request, view
+            )
+        self.request = request
+        try:
+            self.keyset_page = paginator.page(cursor)
+        except InvalidCursor:
+            raise NotFound("Некорректный курсор")
+        return self.keyset_page.object_list
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Асинхронный вариант paginate_queryset() на асинхронном ORM."""
+        paginator, cursor = self._keyset_paginator(queryset, request, view)
+        if cursor is None:
+            return await self._apaginate_pages(paginator.ordered(), request)
+        self.request = request
+        try:
+            self.keyset_page = await paginator.apage(cursor)
+        except InvalidCursor:
+            raise NotFound("Некорректный курсор")
+        return self.keyset_page.object_list
+
+    def _keyset_paginator(self, queryset, request, view):
+        self.keyset_page = None
+        ordering = getattr(view, "keyset_ordering", None) or self.ordering
+        paginator = KeysetPaginator(
+            queryset, self.get_page_size(request), ordering
+        )
+        return paginator, request.query_params.get(self.cursor_query_param)
+
+    async def _apaginate_pages(self, queryset, request):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as error:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(error)
+                )
+            )
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset_page is None:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": self._cursor_link(self.keyset_page.next_cursor),
+                "previous": self._cursor_link(
+                    self.keyset_page.previous_cursor
+                ),
+                "results": data,
+            }
+        )
+
+    def _cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
@@ -0,0 +1,217 @@
+from functools import lru_cache
+from hashlib import md5
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections, models, router, transaction
+from django.db.models.lookups import Exact, In
+
+from . import caching
+
+KEY_PREFIX = "querycache:"
+
+
+def table_scope(table: str) -> str:
+    return f"query:{table}"
+
+
+def bulk_scope(table: str) -> str:
+    return f"query:{table}:bulk"
+
+
+def row_scope(table: str, pk) -> str:
+    return f"query:{table}:{pk}"
+
+
+def invalidate_rows(model, pks) -> None:
+    """Сбрасывает выборки таблицы модели и выборки строк ``pks`` по ключу."""
+    table = model._meta.db_table
+    caching.invalidate(
+        table_scope(table), *(row_scope(table, pk) for pk in pks)
+    )
+    _mark_pending_writes(model)
+    caching.record("querysets", "invalidations")
+
+
+def invalidate_table(model) -> None:
+    """Сбрасывает все выборки таблицы модели после массового изменения."""
+    table = model._meta.db_table
+    caching.invalidate(table_scope(table), bulk_scope(table))
+    _mark_pending_writes(model)
+    caching.record("querysets", "invalidations")
+
+
+def _writes_committed() -> None:
+    pass
+
+
+def _mark_pending_writes(model) -> None:
+    """Отмечает незафиксированные изменения в открытой транзакции.
+
+    Отметка — обработчик on_commit: Django удаляет его при откате
+    транзакции или точки сохранения и после фиксации.
+    """
+    using = router.db_for_write(model)
+    if connections[using].in_atomic_block:
+        transaction.on_commit(_writes_committed, using=using)
+
+
+def _has_pending_writes(connection) -> bool:
+    return connection.in_atomic_block and any(
+        func is _writes_committed for _, func, _ in connection.run_on_commit
+    )
+
+
+@lru_cache(maxsize=None)
+def _models_by_table() -> dict:
+    return {
+        model._meta.db_table: model
+        for model in apps.get_models(include_auto_created=True)
+    }
+
+
+def _tables(sql: str, connection) -> dict:
+    return {
+        table: model
+        for table, model in _models_by_table().items()
+        if connection.ops.quote_name(table) in sql
+    }
+
+
+def _row_pks(queryset) -> list[str] | None:
+    """Ключи строк, если выборка отбирает строки только по первичному
+    ключу (``pk=...`` или ``pk__in=[...]``)."""
+    where = queryset.query.where
+    if where.negated or len(where.children) != 1:
+        return None
+    lookup = where.children[0]
+    pk = queryset.model._meta.pk
+    if not isinstance(lookup, (Exact, In)):
+        return None
+    if getattr(lookup.lhs, "target", None) != pk:
+        return None
+    values = [lookup.rhs] if isinstance(lookup, Exact) else lookup.rhs
+    if not isinstance(values, (list, tuple, set)):
+        return None
+    try:
+        return sorted(str(pk.to_python(value)) for value in values)
+    except (TypeError, ValidationError):
+        return None
+
+
+def _scopes(queryset, sql: str) -> list[str] | None:
+    tables = _tables(sql, connections[queryset.db])
+    if not tables or not all(
+        issubclass(model._default_manager._queryset_class, CachedQuerySet)
+        for model in tables.values()
+    ):
+        return None
+    table = queryset.model._meta.db_table
+    pks = _row_pks(queryset) if list(tables) == [table] else None
+    if pks is not None:
+        return [bulk_scope(table), *(row_scope(table, pk) for pk in pks)]
+    return [table_scope(table) for table in sorted(tables)]
+
+
+def fetch(queryset) -> list | None:
+    """Результаты выборки из кэша; None — выборку кэшировать нельзя.
+
+    Ключ — нормализованный SQL с параметрами. Вместе с результатами
+    сохраняются версии таблиц, из которых читает запрос (для выборки строк
+    по первичному ключу — версии этих строк), а сохранение, удаление и
+    массовые изменения моделей увеличивают их, как и версии страниц.
+    Выборки с таблицами моделей без CachedQuerySet не кэшируются: их
+    изменения не сбрасывают кэш. Не кэшируются и выборки в транзакции с
+    незафиксированными изменениями: версии уже увеличены, и после отката
+    в кэше остались бы данные, которых нет в базе.
+    """
+    if queryset.query.select_for_update or _has_pending_writes(
+        connections[queryset.db]
+    ):
+        return None
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    scopes = _scopes(queryset, sql)
+    if scopes is None:
+        return None
+    key = md5(
+        repr(
+            (
+                queryset.db,
+                queryset._iterable_class.__name__,
+                " ".join(sql.split()),
+                params,
+            )
+        ).encode()
+    ).hexdigest()
+    key = f"{KEY_PREFIX}{key}"
+    versions = caching.get_versions(scopes)
+    entry = cache.get(key)
+    if entry is not None and entry["versions"] == versions:
+        caching.record("querysets", "hits")
+        return entry["results"]
+    caching.record("querysets", "misses")
+    results = list(queryset._iterable_class(queryset))
+    cache.set(
+        key,
+        {"versions": versions, "results": results},
+        settings.QUERYSET_CACHE_TIMEOUT,
+    )
+    return results
+
+
+class CachedQuerySet(models.QuerySet):
+    """QuerySet, результаты которого можно кэшировать вызовом cached().
+
+    Массовые update(), delete() и bulk_create() сбрасывают кэш выборок
+    таблицы, сохранение и удаление отдельных объектов — сигналы моделей.
+    Кэш отключается настройкой ``QUERYSET_CACHE``.
+    """
+
+    _cache_results = False
+
+    def cached(self):
+        clone = self._chain()
+        clone._cache_results = True
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cache_results = self._cache_results
+        return clone
+
+    def _fetch_all(self) -> None:
+        if (
+            self._result_cache is None
+            and self._cache_results
+            and settings.QUERYSET_CACHE
+        ):
+            self._result_cache = fetch(self)
+        super()._fetch_all()
+
+    def update(self, **kwargs) -> int:
+        rows = super().update(**kwargs)
+        invalidate_table(self.model)
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        result = super().delete()
+        invalidate_table(self.model)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_create(self, objs, *args, **kwargs) -> list:
+        objs = super().bulk_create(objs, *args, **kwargs)
+        invalidate_table(self.model)
+        return objs
+
+
+CachedManager = models.Manager.from_queryset(CachedQuerySet)
@@ -0,0 +1,231 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Func, Q, QuerySet, TextField, Value
+from django.db.models.functions import Greatest, Upper
+from django.utils.module_loading import import_string
+
+from .models import Author, Book
+
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_insert
+    AFTER INSERT ON catalog_book BEGIN
+        INSERT INTO catalog_book_search (book_id, title, author, summary)
+        SELECT new.id, new.title, catalog_author.name, new.summary
+        FROM catalog_author
+        WHERE catalog_author.id = new.author_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_update
+    AFTER UPDATE OF title, author_id, summary ON catalog_book
+    WHEN old.title IS NOT new.title
+        OR old.author_id IS NOT new.author_id
+        OR old.summary IS NOT new.summary
+    BEGIN
+        UPDATE catalog_book_search
+        SET title = new.title,
+            author = (
+                SELECT name FROM catalog_author WHERE id = new.author_id
+            ),
+            summary = new.summary
+        WHERE book_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_book_fts_delete
+    AFTER DELETE ON catalog_book BEGIN
+        DELETE FROM catalog_book_search WHERE book_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS catalog_author_fts_update
+    AFTER UPDATE OF name ON catalog_author
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE catalog_book_search
+        SET author = new.name
+        WHERE book_id IN (
+            SELECT id FROM catalog_book WHERE author_id = new.id
+        );
+    END
+    """,
+]
+
+
+def install_sqlite_triggers(connection) -> None:
+    """Создает триггеры, синхронизирующие индекс FTS5 с книгами и авторами.
+
+    SQLite удаляет триггеры таблицы, когда миграции пересоздают ее при
+    изменении схемы, поэтому функция вызывается после каждого применения
+    миграций. Миграции хранят собственную копию этих триггеров.
+    """
+    with connection.cursor() as cursor:
+        for statement in SQLITE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def set_trigram_threshold(connection) -> None:
+    """Задает порог похожести pg_trgm для сеанса соединения с PostgreSQL.
+
+    Порог действует до закрытия соединения, поэтому задается один раз при
+    его открытии, а не при каждом поиске.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+            [str(settings.SEARCH_TRIGRAM_THRESHOLD)],
+        )
+
+
+class SearchBackend:
+    """Поиск подстроки в названии книги и имени автора без индекса.
+
+    Используется для СУБД, для которых нет специализированного поиска.
+    Бэкенды возвращают книги с аннотациями ``title_headline`` и
+    ``summary_headline``, в которых найденные слова обрамлены маркерами
+    HIGHLIGHT_START и HIGHLIGHT_STOP.
+    """
+
+    supports_fuzzy = False
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        return queryset.filter(
+            Q(title__icontains=query) | Q(author__name__icontains=query)
+        ).annotate(title_headline=F("title"), summary_headline=F("summary"))
+
+    def fuzzy_search(self, queryset: QuerySet, query: str) -> QuerySet:
+        return self.search(queryset, query)
+
+
+class PostgresSearchBackend(SearchBackend):
+    supports_fuzzy = True
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        search_query = SearchQuery(
+            query, config=settings.SEARCH_CONFIG, search_type="websearch"
+        )
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), search_query),
+                title_headline=SearchHeadline(
+                    "title",
+                    search_query,
+                    config=settings.SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    highlight_all=True,
+                ),
+                summary_headline=SearchHeadline(
+                    "summary",
+                    search_query,
+                    config=settings.SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    min_words=15,
+                    max_words=35,
+                ),
+            )
+            .order_by("-rank", "title", "id")
+        )
+
+    def fuzzy_search(self, queryset: QuerySet, query: str) -> QuerySet:
+        """Ищет книги по похожести названия или имени автора с учетом опечаток.
+
+        Условия ``%>`` строятся по тем же выражениям ``UPPER(...)``, что и
+        индексы book_title_upper_gin_idx и author_name_upper_gin_idx, поэтому
+        планировщик может использовать их вместо последовательного чтения.
+        Порог похожести задается при открытии соединения (см.
+        set_trigram_threshold()).
+        """
+        value = query.upper()
+        title_matches = (
+            Book.objects.alias(upper_title=Upper("title"))
+            .filter(upper_title__trigram_word_similar=value)
+            .order_by()
+            .values("pk")
+        )
+        author_matches = (
+            Book.objects.filter(
+                author__in=Author.objects.alias(upper_name=Upper("name"))
+                .filter(upper_name__trigram_word_similar=value)
+                .values("pk")
+            )
+            .order_by()
+            .values("pk")
+        )
+        return (
+            queryset.filter(pk__in=title_matches.union(author_matches))
+            .annotate(
+                similarity=Greatest(
+                    TrigramWordSimilarity(value, Upper("title")),
+                    TrigramWordSimilarity(value, Upper("author__name")),
+                )
+            )
+            .order_by("-similarity", "title", "id")
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Полнотекстовый поиск по индексу FTS5 (модель BookSearchIndex).
+
+    Каждое слово запроса ищется как префикс, слова объединяются через И.
+    Релевантность считается функцией bm25() с весами столбцов, близкими к
+    весам A, B и C поискового вектора в PostgreSQL.
+    """
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        words = re.findall(r"\w+", query)
+        if not words:
+            return queryset.none()
+        match = " ".join(f'"{word}"*' for word in words)
+        document = F("search_index__document")
+        return (
+            queryset.filter(search_index__document__match=match)
+            .annotate(
+                rank=-F("search_index__rank"),
+                title_headline=Func(
+                    document,
+                    Value(1),
+                    Value(HIGHLIGHT_START),
+                    Value(HIGHLIGHT_STOP),
+                    function="highlight",
+                    output_field=TextField(),
+                ),
+                summary_headline=Func(
+                    document,
+                    Value(3),
+                    Value(HIGHLIGHT_START),
+                    Value(HIGHLIGHT_STOP),
+                    Value("…"),
+                    Value(35),
+                    function="snippet",
+                    output_field=TextField(),
+                ),
+            )
+            .order_by("-rank", "title", "id")
+        )
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using: str = DEFAULT_DB_ALIAS) -> SearchBackend:
+    if settings.SEARCH_BACKEND:
+        return import_string(settings.SEARCH_BACKEND)()
+    return BACKENDS.get(connections[using].vendor, SearchBackend)()
@@ -1,9 +1,121 @@
 from rest_framework import serializers
 
-from .models import Book
+from .models import Author, Book, BookComment, BookRating
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ["id", "name", "date_of_birth", "bio", "photo"]
 
 
 class BookSerializer(serializers.ModelSerializer):
+    """Сериализатор книги с выбором полей и встраиванием связанных объектов.
+
+    Аргумент ``fields`` оставляет только перечисленные поля, а ``expand``
+    заменяет идентификаторы из ``expandable_fields`` вложенными объектами.
+    """
+
+    expandable_fields = {"author": AuthorSerializer}
+
+    class Meta:
+        model = Book
+        exclude = ["search_vector"]
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            self.fields[name] = self.expandable_fields[name](read_only=True)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class BookWriteSerializer(serializers.ModelSerializer):
+    author = serializers.UUIDField(source="author_id")
+
     class Meta:
         model = Book
-        fields = "__all__"
+        fields = ["title", "author", "summary", "publication_year"]
+        extra_kwargs = {
+            "publication_year": {"min_value": 0, "max_value": 2999}
+        }
+
+
+class BookRatingWriteSerializer(serializers.ModelSerializer):
+    book = serializers.UUIDField(source="book_id")
+
+    class Meta:
+        model = BookRating
+        fields = ["book", "rate"]
+
+
+class BookCommentWriteSerializer(serializers.ModelSerializer):
+    book = serializers.UUIDField(source="book_id")
+
+    class Meta:
+        model = BookComment
+        fields = ["book", "content"]
+
+
+class ValuesSerializer:
+    """Сериализует строки ``values()`` так же, как ModelSerializer объекты.
+
+    Поля и их порядок берутся из переданного сериализатора, но модели
+    и полей DRF на каждую строку не создается: значения простых полей
+    преобразуются методами to_representation(), у файлов строится URL,
+    у связей остается первичный ключ, а вложенные сериализаторы читают
+    столбцы связанной модели из той же строки.
+    """
+
+    def __init__(self, serializer: serializers.ModelSerializer, prefix=""):
+        model = serializer.Meta.model
+        request = serializer.context.get("request")
+        self.lookups = []
+        self.columns = []
+        for name, field in serializer.fields.items():
+            lookup = f"{prefix}{field.source}"
+            if isinstance(field, serializers.ModelSerializer):
+                nested = ValuesSerializer(field, prefix=f"{lookup}__")
+                self.lookups.extend(nested.lookups)
+                self.columns.append((name, None, nested.to_representation))
+                continue
+            if isinstance(field, serializers.FileField):
+                convert = self._file_url(
+                    model._meta.get_field(field.source).storage, request
+                )
+            elif isinstance(field, serializers.RelatedField):
+                convert = None
+            else:
+                convert = field.to_representation
+            self.lookups.append(lookup)
+            self.columns.append((name, lookup, convert))
+        self.pk_lookup = f"{prefix}{model._meta.pk.name}"
+        if self.pk_lookup not in self.lookups:
+            self.lookups.append(self.pk_lookup)
+
+    def to_representation(self, row: dict) -> dict | None:
+        if row[self.pk_lookup] is None:
+            return None
+        data = {}
+        for name, lookup, convert in self.columns:
+            if lookup is None:
+                data[name] = convert(row)
+                continue
+            value = row[lookup]
+            if value is not None and convert is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+    @staticmethod
+    def _file_url(storage, request):
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            if request is not None:
+                return request.build_absolute_uri(url)
+            return url
+
+        return convert
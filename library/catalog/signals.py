@@ -0,0 +1,121 @@
+from django.core.signals import setting_changed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import autocomplete, caching, querycache
+from .facets import bump_catalog_version
+from .models import Author, Book, BookComment, BookRating, BookTrending
+from .search import install_sqlite_triggers, set_trigram_threshold
+
+
+@receiver(post_delete, sender=BookRating)
+def decrement_rating_counters(sender, instance, **kwargs) -> None:
+    Book.update_rating_counters(instance.book_id, -1, -instance.rate)
+    BookTrending.objects.refresh([instance.book_id])
+
+
+@receiver(post_save, sender=BookComment)
+@receiver(post_delete, sender=BookComment)
+def touch_commented_book(sender, instance, **kwargs) -> None:
+    Book.touch(instance.book_id)
+
+
+@receiver(post_save, sender=Book)
+def index_book_title(sender, instance, **kwargs) -> None:
+    autocomplete.index.add("book", instance.pk, instance.title)
+
+
+@receiver(post_save, sender=Author)
+def index_author_name(sender, instance, **kwargs) -> None:
+    autocomplete.index.add("author", instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book_title(sender, instance, **kwargs) -> None:
+    autocomplete.index.remove("book", instance.pk)
+
+
+@receiver(post_delete, sender=Author)
+def unindex_author_name(sender, instance, **kwargs) -> None:
+    autocomplete.index.remove("author", instance.pk)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_catalog_facets(sender, **kwargs) -> None:
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_pages(sender, instance, **kwargs) -> None:
+    caching.invalidate(
+        "books",
+        f"book:{instance.pk}",
+        f"author:{instance.author_id}",
+        f"author:{getattr(instance, '_loaded_author_id', instance.author_id)}",
+    )
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_author_pages(sender, instance, **kwargs) -> None:
+    book_ids = Book.objects.filter(author=instance).values_list(
+        "pk", flat=True
+    )
+    caching.invalidate(
+        "books",
+        "authors",
+        f"author:{instance.pk}",
+        *(f"book:{book_id}" for book_id in book_ids),
+    )
+
+
+@receiver(post_save, sender=BookComment)
+@receiver(post_delete, sender=BookComment)
+@receiver(post_save, sender=BookRating)
+@receiver(post_delete, sender=BookRating)
+def invalidate_book_page(sender, instance, **kwargs) -> None:
+    caching.invalidate(f"book:{instance.book_id}")
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=BookComment)
+@receiver(post_delete, sender=BookComment)
+@receiver(post_save, sender=BookRating)
+@receiver(post_delete, sender=BookRating)
+def invalidate_cached_queries(sender, instance, **kwargs) -> None:
+    querycache.invalidate_rows(sender, [instance.pk])
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs) -> None:
+    connection = connections[using]
+    if (
+        sender.label == "catalog"
+        and connection.vendor == "sqlite"
+        and "catalog_book_search" in connection.introspection.table_names()
+    ):
+        install_sqlite_triggers(connection)
+
+
+@receiver(connection_created)
+def configure_trigram_threshold(sender, connection, **kwargs) -> None:
+    if connection.vendor == "postgresql":
+        set_trigram_threshold(connection)
+
+
+@receiver(setting_changed)
+def reconfigure_trigram_threshold(sender, setting, **kwargs) -> None:
+    if setting != "SEARCH_TRIGRAM_THRESHOLD":
+        return
+    for connection in connections.all(initialized_only=True):
+        if connection.vendor == "postgresql" and connection.connection:
+            set_trigram_threshold(connection)
@@ -0,0 +1,20 @@
+(function () {
+    const input = document.getElementById("search");
+    const suggestions = document.getElementById("search-suggestions");
+    let timer = null;
+    input.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () {
+            const url = input.dataset.autocompleteUrl + "?q=" + encodeURIComponent(input.value);
+            fetch(url)
+                .then((response) => response.json())
+                .then((data) => {
+                    suggestions.replaceChildren(...data.results.map((item) => {
+                        const option = document.createElement("option");
+                        option.value = item.label;
+                        return option;
+                    }));
+                });
+        }, 150);
+    });
+})();
@@ -1,4 +1,10 @@
 from django import template
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from ..caching import render_fragments
+from ..search import HIGHLIGHT_START, HIGHLIGHT_STOP
 
 register = template.Library()
 
@@ -13,6 +19,53 @@ def param_replace(context, **kwargs):
     return d.urlencode()
 
 
+@register.filter
+def highlight(value):
+    return mark_safe(
+        escape(value)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+@register.simple_tag
+def book_cards(books, show_author=True):
+    """Карточки книг страницы из кэша, ключ — книга и дата ее изменения."""
+    return mark_safe(
+        "".join(
+            render_fragments(
+                list(books),
+                lambda book: (
+                    f"book:{int(show_author)}:{book.pk}:"
+                    f"{book.updated_at.timestamp()}"
+                ),
+                lambda book: render_to_string(
+                    "catalog/book_card.html",
+                    {"book": book, "show_author": show_author},
+                ),
+            )
+        )
+    )
+
+
+@register.simple_tag
+def author_cards(authors):
+    """Карточки авторов страницы из кэша, ключ — автор и дата изменения."""
+    return mark_safe(
+        "".join(
+            render_fragments(
+                list(authors),
+                lambda author: (
+                    f"author:{author.pk}:{author.updated_at.timestamp()}"
+                ),
+                lambda author: render_to_string(
+                    "catalog/author_card.html", {"author": author}
+                ),
+            )
+        )
+    )
+
+
 @register.filter
 def add_class(field, class_name):
     return field.as_widget(
@@ -0,0 +1,128 @@
+import os
+import time
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog.cache_backends import GENERATION_KEY
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase, override_settings
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "catalog.cache_backends.TieredCache",
+            "LOCATION": "tiered-shared",
+            "OPTIONS": {"MAX_ENTRIES": 3, "LOCAL_TIMEOUT": 60},
+        },
+        "tiered-shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tiered-shared",
+        },
+    }
+)
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.shared = caches["tiered-shared"]
+
+    def test_local_hit(self):
+        cache.set("key", {"value": 1})
+        with mock.patch.object(self.shared, "get") as get:
+            self.assertEqual(cache.get("key"), {"value": 1})
+            self.assertEqual(cache.get_many(["key"]), {"key": {"value": 1}})
+        get.assert_not_called()
+
+    def test_local_copy_is_isolated(self):
+        cache.set("key", [1])
+        cache.get("key").append(2)
+        self.assertEqual(cache.get("key"), [1])
+
+    def test_miss_reads_shared(self):
+        self.shared.set("key", 1)
+        self.shared.set("other", 2)
+        self.assertEqual(
+            cache.get_many(["key", "other", "x"]),
+            {"key": 1, "other": 2},
+        )
+        with mock.patch.object(self.shared, "get_many") as get_many:
+            self.assertEqual(
+                cache.get_many(["key", "other"]),
+                {"key": 1, "other": 2},
+            )
+        get_many.assert_not_called()
+        self.assertIsNone(cache.get("x"))
+
+    def test_other_worker_invalidation(self):
+        cache.set("key", 1)
+        self.shared.set("key", 2)
+        self.shared.incr(GENERATION_KEY)
+        self.assertEqual(cache.get("key"), 1)
+        # Django закрывает кэши в конце каждого запроса.
+        cache.close()
+        self.assertEqual(cache.get("key"), 2)
+
+    def test_writes_bump_generation(self):
+        cache.set("key", 1)
+        for change in [
+            lambda: cache.incr("key"),
+            lambda: cache.decr("key"),
+            lambda: cache.delete("key"),
+            lambda: cache.delete_many(["key"]),
+        ]:
+            generation = self.shared.get(GENERATION_KEY)
+            change()
+            self.assertGreater(self.shared.get(GENERATION_KEY), generation)
+
+    def test_incr(self):
+        cache.set("key", 1)
+        self.assertEqual(cache.incr("key"), 2)
+        self.assertEqual(cache.get("key"), 2)
+        self.assertEqual(self.shared.get("key"), 2)
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+
+    def test_add(self):
+        self.assertTrue(cache.add("key", 1))
+        self.assertFalse(cache.add("key", 2))
+        self.assertEqual(cache.get("key"), 1)
+        self.assertTrue(cache.has_key("key"))
+        self.assertFalse(cache.has_key("missing"))
+
+    def test_lru_size(self):
+        cache.set_many({"a": 1, "b": 2, "c": 3})
+        cache.get("a")
+        cache.set("d", 4)
+        with mock.patch.object(
+            self.shared, "get_many", wraps=self.shared.get_many
+        ) as get_many:
+            self.assertEqual(
+                cache.get_many(["a", "b", "c", "d"]),
+                {"a": 1, "b": 2, "c": 3, "d": 4},
+            )
+        get_many.assert_called_once_with(["b"], version=None)
+
+    def test_local_timeout(self):
+        cache.set("key", 1)
+        later = time.monotonic() + 61
+        with mock.patch.object(
+            self.shared, "get", wraps=self.shared.get
+        ) as get, mock.patch(
+            "catalog.cache_backends.time.monotonic", return_value=later
+        ):
+            self.assertEqual(cache.get("key"), 1)
+        get.assert_called_once()
+
+    def test_shared_timeout_respected(self):
+        cache.set("key", 1, timeout=0)
+        self.assertIsNone(cache.get("key"))
+
+    def test_clear(self):
+        cache.set("key", 1)
+        cache.clear()
+        self.assertIsNone(cache.get("key"))
+        self.assertIsNone(self.shared.get("key"))
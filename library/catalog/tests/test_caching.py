@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog import caching
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+
+class GetOrComputeTest(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.compute = mock.Mock(side_effect=["first", "second"])
+
+    def get(self, version=1):
+        return caching.get_or_compute(
+            "key", self.compute, version=version, timeout=60, group="facets"
+        )
+
+    def hold_lock(self):
+        self.assertTrue(caching._acquire("caching:facets:key"))
+        self.addCleanup(caching._release, "caching:facets:key")
+
+    def test_cached(self):
+        self.assertEqual(self.get(), "first")
+        self.assertEqual(self.get(), "first")
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_new_version_recomputed(self):
+        self.get()
+        self.assertEqual(self.get(version=2), "second")
+        self.assertEqual(self.get(version=2), "second")
+
+    def test_stale_served_while_locked(self):
+        self.get()
+        self.hold_lock()
+        self.assertEqual(self.get(version=2), "first")
+        self.assertEqual(self.compute.call_count, 1)
+        caching._release("caching:facets:key")
+        self.assertEqual(self.get(version=2), "second")
+
+    def test_expired_served_while_locked(self):
+        caching._set_entry("caching:facets:key", "expired", 1, timeout=-1)
+        self.hold_lock()
+        self.assertEqual(self.get(), "expired")
+        self.compute.assert_not_called()
+        caching._release("caching:facets:key")
+        self.assertEqual(self.get(), "first")
+
+    @override_settings(CACHE_LOCK_WAIT=5)
+    def test_waits_for_single_flight(self):
+        started, finish = threading.Event(), threading.Event()
+        results = []
+
+        def slow():
+            started.set()
+            finish.wait(5)
+            return "slow"
+
+        def worker(compute):
+            results.append(
+                caching.get_or_compute(
+                    "key", compute, version=1, timeout=60, group="facets"
+                )
+            )
+
+        first = threading.Thread(target=worker, args=[slow])
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=worker, args=[self.compute])
+        second.start()
+        time.sleep(0.1)
+        finish.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(results, ["slow", "slow"])
+        self.compute.assert_not_called()
+
+    def test_wait_is_bounded(self):
+        self.hold_lock()
+        started = time.monotonic()
+        self.assertEqual(self.get(), "first")
+        self.assertLess(time.monotonic() - started, 1)
+        self.compute.assert_called_once()
+
+    def test_lock_released_on_error(self):
+        self.compute.side_effect = [ValueError, "second"]
+        with self.assertRaises(ValueError):
+            self.get()
+        self.assertEqual(self.get(), "second")
+
+    def test_stats(self):
+        self.get()
+        self.get()
+        self.hold_lock()
+        self.get(version=2)
+        stats = caching.get_stats()["facets"]
+        self.assertEqual(stats["recomputes"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["stale"], 1)
+        self.assertEqual(stats["hit_ratio"], round(1 / 3, 4))
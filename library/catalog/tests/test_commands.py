@@ -0,0 +1,177 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from catalog.models import Author, Book, BookRating, BookTrending
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase, TestCase
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class RebuildRatingCountersCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.users = [
+            User.objects.create_user(
+                username=f"user{i}",
+                password=f"password{i}",
+                email=f"user{i}@email.com",
+            )
+            for i in range(3)
+        ]
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                added_by=cls.users[0],
+            )
+            for i in range(5)
+        ]
+        for i, book in enumerate(cls.books[:4]):
+            for user in cls.users:
+                BookRating.objects.create(book=book, user=user, rate=i + 1)
+        Book.objects.update(rating_count=0, rating_sum=0)
+
+    def test_rebuilds_counters_in_chunks(self):
+        out = StringIO()
+        call_command("rebuild_rating_counters", chunk_size=2, stdout=out)
+        self.assertIn("5", out.getvalue())
+        for i, book in enumerate(self.books[:4]):
+            book.refresh_from_db()
+            self.assertEqual(book.rating_count, 3)
+            self.assertEqual(book.rating_sum, 3 * (i + 1))
+
+    def test_resets_counters_of_unrated_books(self):
+        Book.objects.filter(pk=self.books[4].pk).update(
+            rating_count=7, rating_sum=21
+        )
+        call_command("rebuild_rating_counters", stdout=StringIO())
+        self.books[4].refresh_from_db()
+        self.assertEqual(self.books[4].rating_count, 0)
+        self.assertEqual(self.books[4].rating_sum, 0)
+
+
+class RefreshTrendingCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                added_by=cls.user,
+            )
+            for i in range(5)
+        ]
+        for book in cls.books[:3]:
+            BookRating.objects.create(book=book, user=cls.user, rate=5)
+        BookTrending.objects.all().delete()
+
+    def test_fills_leaderboard_for_rated_books(self):
+        call_command("refresh_trending", chunk_size=2, stdout=StringIO())
+        self.assertEqual(
+            set(BookTrending.objects.values_list("book", flat=True)),
+            {book.pk for book in self.books[:3]},
+        )
+
+    def test_old_ratings_leave_window(self):
+        BookRating.objects.filter(book=self.books[0]).update(
+            updated_at=timezone.now() - timedelta(days=60)
+        )
+        call_command("refresh_trending", stdout=StringIO())
+        trending = BookTrending.objects.get(book=self.books[0])
+        self.assertEqual(trending.recent_activity, 0)
+        self.assertLess(
+            trending.score, BookTrending.objects.get(book=self.books[1]).score
+        )
+
+    def test_repeats_with_interval(self):
+        command = "catalog.management.commands.refresh_trending"
+        with mock.patch(
+            f"{command}.time.sleep", side_effect=[None, KeyboardInterrupt]
+        ) as sleep, mock.patch(f"{command}.close_old_connections"):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    "refresh_trending", interval=60, stdout=StringIO()
+                )
+        sleep.assert_called_with(60)
+        self.assertEqual(sleep.call_count, 2)
+
+
+class BenchmarkBooksAPICommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        for i in range(3):
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+            )
+
+    def test_compares_both_paths(self):
+        for expand in [False, True]:
+            out = StringIO()
+            call_command(
+                "benchmark_books_api", repeat=1, expand=expand, stdout=out
+            )
+            self.assertIn("ModelSerializer", out.getvalue())
+            self.assertIn("Книг на странице: 3", out.getvalue())
+
+
+class LoadtestCommandTest(LiveServerTestCase):
+    def test_reports_throughput(self):
+        out = StringIO()
+        url = f"{self.live_server_url}/api/v1/books/"
+        call_command(
+            "loadtest",
+            url,
+            concurrency=2,
+            requests=10,
+            warmup=1,
+            stdout=out,
+        )
+        self.assertIn(f"{url}: ", out.getvalue())
+        self.assertIn("p99", out.getvalue())
+        self.assertIn("ошибок: 0", out.getvalue())
+
+    def test_requires_http_url(self):
+        with self.assertRaises(CommandError):
+            call_command("loadtest", "ftp://localhost/", stdout=StringIO())
@@ -0,0 +1,84 @@
+import os
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.state import StateApps
+from django.test import TransactionTestCase
+
+LEGACY_RATED_AT = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+GIN_INDEXES = {
+    "author_name_upper_gin_idx",
+    "book_title_upper_gin_idx",
+    "book_search_vector_idx",
+}
+
+
+class MigrationsTest(TransactionTestCase):
+    def migrate(self, targets: list[tuple[str, str]]) -> StateApps:
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def leaf_nodes(self) -> list[tuple[str, str]]:
+        return MigrationExecutor(connection).loader.graph.leaf_nodes()
+
+    def indexes(self) -> set[str]:
+        with connection.cursor() as cursor:
+            return {
+                name
+                for table in ("catalog_author", "catalog_book")
+                for name in connection.introspection.get_constraints(
+                    cursor, table
+                )
+            }
+
+    def tearDown(self) -> None:
+        self.migrate(self.leaf_nodes())
+
+    def test_backward_and_forward(self) -> None:
+        """Миграции откатываются до начальных и применяются заново."""
+        leaf_nodes = self.leaf_nodes()
+        self.migrate([("catalog", "0004_book_rating_counters")])
+        self.migrate(leaf_nodes)
+
+        indexes = self.indexes()
+        if connection.vendor == "postgresql":
+            self.assertLessEqual(GIN_INDEXES, indexes)
+        else:
+            self.assertFalse(GIN_INDEXES & indexes)
+
+    def test_existing_ratings_backfill(self) -> None:
+        """Оценки до 0005 получают прошлую дату и попадают в популярные."""
+        apps = self.migrate([("catalog", "0004_book_rating_counters")])
+        user = apps.get_model(settings.AUTH_USER_MODEL).objects.create(
+            username="user", email="user@email.com"
+        )
+        author = apps.get_model("catalog", "Author").objects.create(
+            name="Author", bio="Bio"
+        )
+        book = apps.get_model("catalog", "Book").objects.create(
+            title="Book", summary="Summary", author=author
+        )
+        apps.get_model("catalog", "BookRating").objects.create(
+            book=book, user=user, rate=5
+        )
+
+        apps = self.migrate(
+            [("catalog", "0005_bookrating_timestamps_booktrending")]
+        )
+        rating = apps.get_model("catalog", "BookRating").objects.get()
+        trending = apps.get_model("catalog", "BookTrending").objects.get()
+        self.assertEqual(rating.created_at, LEGACY_RATED_AT)
+        self.assertEqual(rating.updated_at, LEGACY_RATED_AT)
+        self.assertEqual(trending.book_id, book.pk)
+        self.assertEqual(trending.recent_activity, 0)
+        self.assertAlmostEqual(trending.score, (3.0 * 10 + 5) / (10 + 1))
@@ -5,12 +5,15 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
 django.setup()
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from unittest import mock, skipUnless
 
-from catalog.models import Author, Book, BookComment, BookRating
+from catalog.models import Author, Book, BookComment, BookRating, BookTrending
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.db.models.signals import post_save, pre_save
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 User = get_user_model()
@@ -54,6 +57,16 @@ class AuthorModelTest(TestCase):
             self.author_default_photo.photo.url, expected_photo_url
         )
 
+    def test_cards(self):
+        author = Author.objects.cards().get(pk=self.author.pk)
+        self.assertEqual(
+            author.get_deferred_fields(),
+            {"date_of_birth", "bio"},
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(author.name, "Author 1")
+            self.assertEqual(author.photo.url, "/media/authors/photo.jpg")
+
 
 class BookModelTestCase(TestCase):
     @classmethod
@@ -116,7 +129,25 @@ class BookModelTestCase(TestCase):
             ),
         )
         expected_average_rating = 4.5
-        self.assertEqual(self.book.average_rating, expected_average_rating)
+        self.book.refresh_from_db()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.book.average_rating, expected_average_rating)
+
+    def test_cards(self):
+        book = Book.objects.cards().get(pk=self.book.pk)
+        self.assertIn("summary", book.get_deferred_fields())
+        self.assertIn("search_vector", book.get_deferred_fields())
+        self.assertIn("bio", book.author.get_deferred_fields())
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title, "Book 1")
+            self.assertEqual(book.poster.url, "/media/posters/book1.jpg")
+            self.assertEqual(book.author.name, "Author 1")
+            self.assertEqual(
+                book.author.get_absolute_url(), self.author.get_absolute_url()
+            )
+
+    def test_average_rating_without_rates(self):
+        self.assertIsNone(self.book_default_poster.average_rating)
 
     def test_poster_default_url(self):
         expected_poster_url = "/media/posters/no-poster.jpg"
@@ -229,3 +260,187 @@ class BookRatingModelTestCase(TestCase):
         existing_rating.save()
         updated_rating = BookRating.objects.get(book=self.book, user=self.user)
         self.assertEqual(updated_rating.rate, 4)
+
+    def test_save_sends_signals(self):
+        other_user = User.objects.create_user(
+            username="user3",
+            password="password3",
+            email="user3@email.com",
+        )
+        receiver = mock.Mock()
+        pre_save.connect(receiver, sender=BookRating)
+        post_save.connect(receiver, sender=BookRating)
+        self.addCleanup(pre_save.disconnect, receiver, sender=BookRating)
+        self.addCleanup(post_save.disconnect, receiver, sender=BookRating)
+        rating = BookRating.objects.create(
+            book=self.book, user=other_user, rate=3
+        )
+        self.assertEqual(receiver.call_count, 2)
+        self.assertTrue(receiver.call_args.kwargs["created"])
+        rating.rate = 4
+        rating.save(update_fields=["rate", "updated_at"])
+        self.assertEqual(receiver.call_count, 4)
+        self.assertFalse(receiver.call_args.kwargs["created"])
+        self.assertEqual(
+            receiver.call_args.kwargs["update_fields"],
+            {"rate", "updated_at"},
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_sum, 9)
+
+    def test_rating_counters_on_create(self):
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 1)
+        self.assertEqual(self.book.rating_sum, 5)
+
+    def test_rating_counters_on_rerate(self):
+        BookRating(rate=2, book=self.book, user=self.user).save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 1)
+        self.assertEqual(self.book.rating_sum, 2)
+
+    def test_rating_counters_on_update(self):
+        self.rating.rate = 3
+        self.rating.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 1)
+        self.assertEqual(self.book.rating_sum, 3)
+
+    def test_rating_counters_on_delete(self):
+        self.rating.delete()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 0)
+        self.assertEqual(self.book.rating_sum, 0)
+        self.assertIsNone(self.book.average_rating)
+
+    def test_upsert_inserts_new_rating(self):
+        other_user = User.objects.create_user(
+            username="user3",
+            password="password3",
+            email="user3@email.com",
+        )
+        rating, previous_rate = BookRating.objects.upsert(
+            book=self.book, user=other_user, rate=3
+        )
+        self.assertIsNone(previous_rate)
+        self.assertEqual(BookRating.objects.get(pk=rating.pk).rate, 3)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 2)
+        self.assertEqual(self.book.rating_sum, 8)
+
+    def test_upsert_updates_existing_rating(self):
+        rating, previous_rate = BookRating.objects.upsert(
+            book=self.book, user=self.user, rate=1
+        )
+        self.assertEqual(previous_rate, 5)
+        self.assertEqual(rating.pk, self.rating.pk)
+        self.assertEqual(
+            BookRating.objects.filter(book=self.book, user=self.user).count(),
+            1,
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 1)
+        self.assertEqual(self.book.rating_sum, 1)
+
+    @skipUnless(connection.vendor == "postgresql", "Требуется PostgreSQL")
+    def test_upsert_single_statement(self):
+        with CaptureQueriesContext(connection) as context:
+            BookRating.objects.upsert(book=self.book, user=self.user, rate=2)
+        rating_statements = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"catalog_bookrating"' in query["sql"]
+            and "GROUP BY" not in query["sql"]
+        ]
+        self.assertEqual(len(rating_statements), 1)
+        self.assertIn("ON CONFLICT", rating_statements[0])
+
+    def test_rating_counters_on_queryset_delete(self):
+        BookRating.objects.filter(book=self.book).delete()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.rating_count, 0)
+        self.assertEqual(self.book.rating_sum, 0)
+
+
+class BookTrendingModelTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.users = [
+            User.objects.create_user(
+                username=f"user{i}",
+                password=f"password{i}",
+                email=f"user{i}@email.com",
+            )
+            for i in range(20)
+        ]
+        cls.author = Author.objects.create(
+            name="Author 1",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2021,
+                added_by=cls.users[0],
+            )
+            for i in range(3)
+        ]
+
+    def test_rating_timestamps(self):
+        rating = BookRating.objects.create(
+            book=self.books[0], user=self.users[0], rate=3
+        )
+        rating = BookRating.objects.get(pk=rating.pk)
+        self.assertEqual(type(rating.created_at), datetime)
+        self.assertAlmostEqual(
+            rating.created_at, rating.updated_at, delta=timedelta(seconds=1)
+        )
+        BookRating.objects.upsert(book=self.books[0], user=self.users[0], rate=4)
+        updated_rating = BookRating.objects.get(pk=rating.pk)
+        self.assertEqual(updated_rating.created_at, rating.created_at)
+        self.assertGreater(updated_rating.updated_at, rating.updated_at)
+
+    def test_rated_book_added_to_leaderboard(self):
+        BookRating.objects.create(book=self.books[0], user=self.users[0], rate=4)
+        trending = BookTrending.objects.get(book=self.books[0])
+        self.assertAlmostEqual(trending.bayesian_rating, (3.0 * 10 + 4) / 11)
+        self.assertEqual(trending.recent_activity, 1.5)
+        self.assertFalse(
+            BookTrending.objects.filter(book=self.books[1]).exists()
+        )
+
+    def test_unrated_book_removed_from_leaderboard(self):
+        rating = BookRating.objects.create(
+            book=self.books[0], user=self.users[0], rate=4
+        )
+        rating.delete()
+        self.assertFalse(
+            BookTrending.objects.filter(book=self.books[0]).exists()
+        )
+
+    def test_many_votes_beat_single_top_vote(self):
+        BookRating.objects.create(book=self.books[0], user=self.users[0], rate=5)
+        for user in self.users:
+            BookRating.objects.create(book=self.books[1], user=user, rate=4)
+        self.assertEqual(
+            list(BookTrending.objects.values_list("book", flat=True)),
+            [self.books[1].pk, self.books[0].pk],
+        )
+
+    def test_recent_activity_raises_score(self):
+        for user in self.users[:5]:
+            BookRating.objects.create(book=self.books[0], user=user, rate=4)
+            BookRating.objects.create(book=self.books[1], user=user, rate=4)
+        BookRating.objects.filter(book=self.books[0]).update(
+            updated_at=datetime.now().astimezone() - timedelta(days=60)
+        )
+        BookTrending.objects.refresh([self.books[0].pk])
+        old = BookTrending.objects.get(book=self.books[0])
+        recent = BookTrending.objects.get(book=self.books[1])
+        self.assertEqual(old.recent_activity, 0)
+        self.assertEqual(old.bayesian_rating, recent.bayesian_rating)
+        self.assertGreater(recent.score, old.score)
@@ -0,0 +1,175 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from unittest import mock
+
+from accounts.views import AccountProfileView
+from catalog import views
+from catalog.models import Author, Book, BookComment, BookRating
+from catalog.pagination import KeysetResultsSetPagination
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+# Бюджет считается по запросам к базе без кэша выборок.
+@override_settings(QUERYSET_CACHE=False)
+class QueryBudgetTest(TestCase):
+    """Число запросов страницы не зависит от количества записей на ней."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        self.book = None
+
+    def create_books(self, number):
+        books = []
+        for _ in range(number):
+            author = Author.objects.create(
+                name=f"Автор {Author.objects.count()}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            books.append(
+                Book.objects.create(
+                    title=f"Книга {Book.objects.count()}",
+                    author=author,
+                    summary="Lorem ipsum dolor sit amet",
+                    publication_year=2023,
+                    poster="posters/book.jpg",
+                    added_by=self.user,
+                )
+            )
+        return books
+
+    def create_author_books(self, number):
+        if self.book is None:
+            self.book = self.create_books(1)[0]
+            number -= 1
+        for _ in range(number):
+            Book.objects.create(
+                title=f"Книга {Book.objects.count()}",
+                author=self.book.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster="posters/book.jpg",
+                added_by=self.user,
+            )
+
+    def create_rated_books(self, number):
+        for book in self.create_books(number):
+            BookRating.objects.upsert(book=book, user=self.user, rate=5)
+
+    def create_comments(self, number):
+        if self.book is None:
+            self.book = self.create_books(1)[0]
+        users = User.objects.bulk_create(
+            User(
+                username=f"user{User.objects.count() + i}",
+                email=f"user{User.objects.count() + i}@email.com",
+            )
+            for i in range(number)
+        )
+        for user in users:
+            BookComment.objects.create(
+                user=user, book=self.book, content="content"
+            )
+
+    def assertConstantQueries(
+        self, create_rows, get_url, view, attribute="paginate_by", rows=100
+    ):
+        with mock.patch.object(view, attribute, rows):
+            create_rows(1)
+            with CaptureQueriesContext(connection) as one_row:
+                response = self.client.get(get_url())
+            self.assertEqual(response.status_code, 200)
+            create_rows(rows - 1)
+            with CaptureQueriesContext(connection) as many_rows:
+                response = self.client.get(get_url())
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(many_rows.captured_queries),
+            len(one_row.captured_queries),
+            "\n".join(query["sql"] for query in many_rows.captured_queries),
+        )
+
+    def test_index(self):
+        self.assertConstantQueries(
+            self.create_rated_books, lambda: reverse("index"), views.IndexView
+        )
+
+    def test_book_list(self):
+        self.assertConstantQueries(
+            self.create_books, lambda: reverse("books"), views.BookListView
+        )
+
+    def test_search(self):
+        self.assertConstantQueries(
+            self.create_books,
+            lambda: reverse("search") + "?q=книга",
+            views.SearchView,
+        )
+
+    def test_author_detail(self):
+        self.assertConstantQueries(
+            self.create_author_books,
+            lambda: self.book.author.get_absolute_url(),
+            views.AuthorDetailView,
+        )
+
+    def test_book_detail_comments(self):
+        self.assertConstantQueries(
+            self.create_comments,
+            lambda: self.book.get_absolute_url(),
+            views.BookDetailView,
+        )
+
+    def test_profile(self):
+        self.client.force_login(self.user)
+        self.assertConstantQueries(
+            self.create_books, lambda: reverse("profile"), AccountProfileView
+        )
+
+    def test_books_api(self):
+        self.assertConstantQueries(
+            self.create_books,
+            lambda: "/api/v1/books/",
+            KeysetResultsSetPagination,
+            attribute="page_size",
+        )
+
+    def test_list_pages_skip_large_columns(self):
+        self.create_rated_books(3)
+        self.create_author_books(2)
+        self.client.force_login(self.user)
+        book_columns = ["summary", "search_vector", "bio"]
+        for url, columns in [
+            (reverse("index"), book_columns),
+            (reverse("books"), book_columns),
+            (reverse("authors"), ["bio"]),
+            (
+                self.book.author.get_absolute_url(),
+                ["summary", "search_vector"],
+            ),
+            (reverse("profile"), book_columns),
+        ]:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            for query in context.captured_queries:
+                for column in columns:
+                    self.assertNotIn(f'."{column}"', query["sql"], url)
@@ -0,0 +1,242 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog import caching
+from catalog.models import Author, Book, BookComment, BookRating
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class QuerySetCacheTest(TransactionTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        self.authors = [
+            Author.objects.create(
+                name=f"Author {i}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            for i in range(2)
+        ]
+        self.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=self.authors[i % 2],
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=self.user,
+            )
+            for i in range(4)
+        ]
+        self.book = self.books[0]
+
+    def author_books(self, author=None):
+        return list(
+            Book.objects.cards()
+            .filter(author=author or self.authors[0])
+            .cached()
+        )
+
+    def assertCached(self, query):
+        with self.assertNumQueries(0):
+            return query()
+
+    def assertQueried(self, query):
+        with self.assertNumQueries(1):
+            return query()
+
+    def test_cached(self):
+        books = self.assertQueried(self.author_books)
+        self.assertEqual(self.assertCached(self.author_books), books)
+        self.assertEqual(books, [self.books[0], self.books[2]])
+        self.assertEqual(
+            self.assertCached(self.author_books)[0].title, "Book 0"
+        )
+        self.assertCached(lambda: self.author_books()[0].author.name)
+
+    def test_opt_in(self):
+        query = lambda: list(Book.objects.filter(author=self.authors[0]))
+        query()
+        self.assertQueried(query)
+
+    def test_key_includes_parameters_and_result_type(self):
+        self.author_books()
+        self.assertQueried(lambda: self.author_books(self.authors[1]))
+        titles = self.assertQueried(
+            lambda: list(
+                Book.objects.filter(author=self.authors[0])
+                .values_list("title", flat=True)
+                .cached()
+            )
+        )
+        self.assertEqual(titles, ["Book 0", "Book 2"])
+
+    def test_save_invalidates_table(self):
+        self.author_books()
+        book = self.books[2]
+        book.title = "Renamed"
+        book.save()
+        books = self.assertQueried(self.author_books)
+        self.assertEqual(books[1].title, "Renamed")
+
+    def test_related_table_invalidates(self):
+        self.author_books()
+        author = self.authors[0]
+        author.name = "Renamed"
+        author.save()
+        self.assertEqual(self.author_books()[0].author.name, "Renamed")
+
+    def test_row_lookup_invalidated_per_row(self):
+        get = lambda author: Author.objects.cached().get(pk=author.pk)
+        for author in self.authors:
+            get(author)
+        author = self.authors[0]
+        author.name = "Renamed"
+        author.save()
+        self.assertEqual(
+            self.assertQueried(lambda: get(author)).name, "Renamed"
+        )
+        self.assertCached(lambda: get(self.authors[1]))
+        Author.objects.create(name="New", date_of_birth="1990-01-01")
+        self.assertCached(lambda: get(self.authors[1]))
+
+    def test_bulk_writes_invalidate(self):
+        get = lambda: Book.objects.cached().get(pk=self.book.pk)
+        for write in [
+            lambda: Book.objects.filter(pk=self.book.pk).update(title="A"),
+            lambda: Book.objects.bulk_update(
+                [Book(pk=self.book.pk, title="B")], ["title"]
+            ),
+            lambda: Book.touch(self.book.pk),
+        ]:
+            get()
+            write()
+            self.assertQueried(get)
+        self.assertEqual(get().title, "B")
+
+    def test_bulk_create_and_delete_invalidate(self):
+        self.author_books()
+        Book.objects.bulk_create(
+            [
+                Book(
+                    title="Bulk",
+                    author=self.authors[0],
+                    publication_year=2023,
+                    added_by=self.user,
+                )
+            ]
+        )
+        self.assertEqual(len(self.assertQueried(self.author_books)), 3)
+        Book.objects.filter(title="Bulk").delete()
+        self.assertEqual(len(self.author_books()), 2)
+
+    def test_comments_and_ratings_invalidate(self):
+        comments = lambda: list(
+            BookComment.objects.filter(book=self.book).cached()
+        )
+        ratings = lambda: list(
+            BookRating.objects.filter(book=self.book).values("rate").cached()
+        )
+        comments()
+        ratings()
+        BookComment.objects.create(
+            user=self.user, book=self.book, content="content"
+        )
+        BookRating.objects.upsert(book=self.book, user=self.user, rate=3)
+        self.assertEqual(len(comments()), 1)
+        self.assertEqual(ratings(), [{"rate": 3}])
+        BookRating.objects.upsert(book=self.book, user=self.user, rate=5)
+        self.assertEqual(ratings(), [{"rate": 5}])
+        BookRating.objects.bulk_upsert(self.user, {self.book.pk: 2})
+        self.assertEqual(ratings(), [{"rate": 2}])
+
+    def test_rollback_not_cached(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            book = self.books[2]
+            book.title = "Renamed"
+            book.save()
+            self.assertEqual(self.author_books()[1].title, "Renamed")
+            self.assertQueried(self.author_books)
+            raise ValueError
+        books = self.assertQueried(self.author_books)
+        self.assertEqual(books[1].title, "Book 2")
+        self.assertCached(self.author_books)
+
+    def test_cached_in_transaction_without_writes(self):
+        self.author_books()
+        with transaction.atomic():
+            self.assertCached(self.author_books)
+
+    def test_tables_without_hooks_not_cached(self):
+        query = lambda: list(
+            Book.objects.filter(added_by__username="user").cached()
+        )
+        query()
+        self.assertQueried(query)
+
+    def test_prefetch_after_cache_hit(self):
+        BookComment.objects.create(
+            user=self.user, book=self.book, content="content"
+        )
+        query = lambda: list(
+            Book.objects.filter(pk=self.book.pk)
+            .prefetch_related("comments")
+            .cached()
+        )
+        query()
+        with self.assertNumQueries(1):
+            self.assertEqual(len(query()[0].comments.all()), 1)
+
+    def test_empty_result(self):
+        self.assertEqual(list(Book.objects.filter(pk__in=[]).cached()), [])
+
+    @override_settings(QUERYSET_CACHE=False)
+    def test_switched_off(self):
+        self.author_books()
+        self.assertQueried(self.author_books)
+
+    def test_views_use_cache(self):
+        self.client.force_login(self.user)
+        for url in [self.authors[0].get_absolute_url(), reverse("profile")]:
+            with CaptureQueriesContext(connection) as first:
+                self.client.get(url)
+            with CaptureQueriesContext(connection) as second:
+                self.client.get(url)
+            self.assertLess(
+                len(second.captured_queries), len(first.captured_queries)
+            )
+            self.assertFalse(
+                any(
+                    query["sql"].startswith("SELECT")
+                    and '"catalog_book"."poster"' in query["sql"]
+                    for query in second.captured_queries
+                ),
+                url,
+            )
+
+    def test_stats(self):
+        self.author_books()
+        self.author_books()
+        self.book.save()
+        stats = caching.get_stats()["querysets"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertGreaterEqual(stats["invalidations"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
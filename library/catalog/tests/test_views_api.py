@@ -0,0 +1,329 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+import uuid
+from unittest import mock
+
+from catalog import renderers
+from catalog.models import Author, Book
+from catalog.views import BooksListAPIView, BooksRetrieveAPIView
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import generics
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+User = get_user_model()
+
+
+class BooksAPIFieldsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.authors = [
+            Author.objects.create(
+                name=f"Author {i}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            for i in range(3)
+        ]
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.authors[i % 3],
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(5)
+        ]
+        cls.book = cls.books[0]
+
+    def detail_url(self, book):
+        return f"/api/v1/books/{book.pk}/"
+
+    def test_default_fields(self):
+        data = self.client.get(self.detail_url(self.book)).json()
+        self.assertEqual(data["author"], str(self.book.author.pk))
+        self.assertIn("summary", data)
+        self.assertNotIn("search_vector", data)
+
+    def test_list_fields(self):
+        with CaptureQueriesContext(connection) as context:
+            data = self.client.get(
+                "/api/v1/books/", {"fields": "id,title"}
+            ).json()
+        for book in data["results"]:
+            self.assertEqual(set(book), {"id", "title"})
+        books_query = context.captured_queries[-1]["sql"]
+        self.assertIn('"title"', books_query)
+        self.assertNotIn('"summary"', books_query)
+        self.assertNotIn('"poster"', books_query)
+
+    def test_detail_fields(self):
+        data = self.client.get(
+            self.detail_url(self.book), {"fields": "title, publication_year"}
+        ).json()
+        self.assertEqual(data, {"title": "Book 0", "publication_year": 2023})
+
+    def test_unknown_field(self):
+        response = self.client.get(
+            "/api/v1/books/", {"fields": "title,search_vector"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json())
+
+    def test_unknown_expand(self):
+        response = self.client.get(
+            self.detail_url(self.book), {"expand": "added_by"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("expand", response.json())
+
+    def test_expand_author(self):
+        data = self.client.get(
+            self.detail_url(self.book), {"expand": "author"}
+        ).json()
+        self.assertEqual(data["author"]["id"], str(self.book.author.pk))
+        self.assertEqual(data["author"]["name"], "Author 0")
+        self.assertEqual(
+            data["author"]["photo"],
+            "http://testserver/media/authors/photo.jpg",
+        )
+
+    def test_list_expand_author_single_query(self):
+        with self.assertNumQueries(2):
+            data = self.client.get(
+                "/api/v1/books/", {"expand": "author"}
+            ).json()
+        self.assertEqual(
+            [book["author"]["name"] for book in data["results"]],
+            [book.author.name for book in self.books],
+        )
+
+    def test_expand_with_fields(self):
+        with CaptureQueriesContext(connection) as context:
+            data = self.client.get(
+                self.detail_url(self.book),
+                {"fields": "title,author", "expand": "author"},
+            ).json()
+        self.assertEqual(set(data), {"title", "author"})
+        self.assertEqual(data["author"]["name"], "Author 0")
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertNotIn('"summary"', context.captured_queries[-1]["sql"])
+
+    def test_expand_ignored_without_field(self):
+        data = self.client.get(
+            self.detail_url(self.book), {"fields": "title", "expand": "author"}
+        ).json()
+        self.assertEqual(data, {"title": "Book 0"})
+
+
+class ReferenceListView(BooksListAPIView):
+    renderer_classes = [JSONRenderer]
+
+    def list(self, request, *args, **kwargs):
+        return generics.ListAPIView.list(self, request, *args, **kwargs)
+
+
+class ReferenceRetrieveView(BooksRetrieveAPIView):
+    renderer_classes = [JSONRenderer]
+
+    def retrieve(self, request, *args, **kwargs):
+        return generics.RetrieveAPIView.retrieve(
+            self, request, *args, **kwargs
+        )
+
+
+class BooksAPIFastPathTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Lorem ipsum\u2028dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Книга «{i}»",
+                author=cls.author,
+                summary="Lorem ipsum\u2029dolor sit amet",
+                publication_year=1860 + i,
+                poster=f"posters/book {i}.jpg" if i % 2 else "",
+                added_by=cls.user if i % 3 else None,
+            )
+            for i in range(8)
+        ]
+        cls.factory = APIRequestFactory()
+
+    def assertSameContent(self, fast_view, reference_view, path, **kwargs):
+        for params in [
+            {},
+            {"fields": "id,title,poster"},
+            {"expand": "author"},
+            {"fields": "title,author", "expand": "author"},
+        ]:
+            responses = []
+            for view in [fast_view, reference_view]:
+                request = self.factory.get(path, params)
+                response = view.as_view()(request, **kwargs)
+                response.render()
+                responses.append(response.content)
+            self.assertEqual(responses[0], responses[1], params)
+
+    def test_list_matches_model_serializer(self):
+        self.assertSameContent(
+            BooksListAPIView, ReferenceListView, "/api/v1/books/"
+        )
+
+    def test_list_cursor_matches_model_serializer(self):
+        cursor = self.client.get("/api/v1/books/?cursor=").json()["next"]
+        self.assertSameContent(BooksListAPIView, ReferenceListView, cursor)
+
+    def test_detail_matches_model_serializer(self):
+        for book in self.books[:2]:
+            self.assertSameContent(
+                BooksRetrieveAPIView,
+                ReferenceRetrieveView,
+                f"/api/v1/books/{book.pk}/",
+                pk=str(book.pk),
+            )
+
+    def test_detail_not_found(self):
+        for pk in ["garbage", self.author.pk]:
+            response = self.client.get(f"/api/v1/books/{pk}/")
+            self.assertEqual(response.status_code, 404)
+
+    def test_stdlib_fallback(self):
+        content = self.client.get("/api/v1/books/").content
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(
+                self.client.get("/api/v1/books/").content, content
+            )
+
+    def test_renderer_escapes_line_separators(self):
+        data = {"text": "a\u2028b\u2029c", "items": [1, None, True]}
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+
+class BooksBatchAPITest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(5)
+        ]
+        cls.missing_id = str(uuid.uuid4())
+
+    def ids(self):
+        return [
+            str(self.books[3].pk),
+            self.missing_id,
+            str(self.books[0].pk),
+            str(self.books[3].pk),
+        ]
+
+    def assertBatch(self, data):
+        self.assertEqual(
+            [book["id"] for book in data["results"]],
+            [str(self.books[3].pk), str(self.books[0].pk)],
+        )
+        self.assertEqual(data["missing"], [self.missing_id])
+
+    def test_get(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("books-batch"), {"ids": ",".join(self.ids())}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertBatch(response.json())
+
+    def test_post(self):
+        for url in ["/api/v1/books/batch", "/api/v1/books/batch/"]:
+            response = self.client.post(
+                url, {"ids": self.ids()}, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 200, url)
+            self.assertBatch(response.json())
+
+    def test_matches_detail(self):
+        book = self.books[1]
+        data = self.client.get(
+            reverse("books-batch"),
+            {"ids": str(book.pk), "expand": "author"},
+        ).json()
+        detail = self.client.get(
+            f"/api/v1/books/{book.pk}/", {"expand": "author"}
+        ).json()
+        self.assertEqual(data["results"], [detail])
+
+    def test_fields(self):
+        data = self.client.get(
+            reverse("books-batch"),
+            {"ids": str(self.books[0].pk), "fields": "title"},
+        ).json()
+        self.assertEqual(data["results"], [{"title": "Book 0"}])
+
+    def test_empty(self):
+        data = self.client.get(reverse("books-batch")).json()
+        self.assertEqual(data, {"results": [], "missing": []})
+
+    def test_invalid_ids(self):
+        for ids in [["garbage"], [1], "garbage"]:
+            response = self.client.post(
+                reverse("books-batch"),
+                {"ids": ids},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("books-batch"), {"ids": "1,2"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BOOKS_BATCH_MAX_IDS=3)
+    def test_max_ids(self):
+        response = self.client.get(
+            reverse("books-batch"),
+            {"ids": ",".join(str(book.pk) for book in self.books)},
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,190 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from asgiref.sync import async_to_sync
+from catalog import views
+from catalog.models import Author, Book
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+
+User = get_user_model()
+
+urlpatterns = [
+    path("search", view=views.AsyncSearchView.as_view(), name="search"),
+    path("books/", view=views.AsyncBookListView.as_view(), name="books"),
+    path("api/v1/books/", view=views.AsyncBooksListAPIView.as_view()),
+    path(
+        "api/v1/books/<pk>/",
+        view=views.AsyncBooksRetrieveAPIView.as_view(),
+    ),
+    path("", include("library.urls")),
+]
+
+
+class AsyncViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.authors = [
+            Author.objects.create(
+                name=f"Author {i}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            for i in range(3)
+        ]
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i % 5}",
+                author=cls.authors[i % 3],
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=1990 + i,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(15)
+        ]
+        cls.book = cls.books[0]
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def async_get(self, url, data=None, **kwargs):
+        async def get():
+            return await self.async_client.get(url, data, **kwargs)
+
+        with override_settings(ROOT_URLCONF=__name__):
+            return async_to_sync(get)()
+
+    def assertSameJSON(self, url, data=None):
+        response = self.client.get(url, data)
+        async_response = self.async_get(url, data)
+        self.assertEqual(async_response.status_code, response.status_code)
+        self.assertEqual(async_response.json(), response.json())
+        return async_response
+
+    def assertSameList(self, url, data=None):
+        response = self.client.get(url, data)
+        cache.clear()
+        async_response = self.async_get(url, data)
+        self.assertEqual(async_response.status_code, 200)
+        context, async_context = response.context_data, async_response.context
+        self.assertEqual(list(async_context["books"]), list(context["books"]))
+        self.assertEqual(async_context["facets"], context["facets"])
+        page, async_page = context["page_obj"], async_context["page_obj"]
+        self.assertEqual(
+            getattr(async_page, "next_cursor", None),
+            getattr(page, "next_cursor", None),
+        )
+        if context["paginator"] is not None:
+            self.assertEqual(
+                async_context["paginator"].count, context["paginator"].count
+            )
+            self.assertEqual(async_page.number, page.number)
+        else:
+            self.assertEqual(async_page.previous_cursor, page.previous_cursor)
+        return page
+
+    def test_views_are_async(self):
+        for view in [
+            views.AsyncSearchView,
+            views.AsyncBookListView,
+            views.AsyncBooksListAPIView,
+            views.AsyncBooksRetrieveAPIView,
+        ]:
+            self.assertTrue(view.view_is_async, view)
+
+    def test_api_list_matches_sync(self):
+        for data in [
+            {},
+            {"page": 2},
+            {"page": "last"},
+            {"page_size": 4},
+            {"fields": "id,title", "expand": "author"},
+            {"expand": "author", "cursor": ""},
+        ]:
+            self.assertSameJSON("/api/v1/books/", data)
+
+    def test_api_cursor_walk_matches_sync(self):
+        url = "/api/v1/books/?cursor="
+        while url:
+            url = self.assertSameJSON(url).json()["next"]
+
+    def test_api_errors_match_sync(self):
+        for data in [
+            {"page": 99},
+            {"cursor": "garbage"},
+            {"fields": "unknown"},
+        ]:
+            self.assertSameJSON("/api/v1/books/", data)
+
+    def test_api_retrieve_matches_sync(self):
+        url = f"/api/v1/books/{self.book.pk}/"
+        self.assertSameJSON(url)
+        self.assertSameJSON(url, {"expand": "author"})
+        self.assertSameJSON(url, {"fields": "id,author", "expand": "author"})
+        response = self.async_get(
+            "/api/v1/books/0b4e7e2c-2f7a-4d59-9d51-6a3c0d2f4a10/"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_api_conditional(self):
+        for url in ["/api/v1/books/", f"/api/v1/books/{self.book.pk}/"]:
+            response = self.async_get(url)
+            self.assertEqual(response["ETag"], self.client.get(url)["ETag"])
+            response = self.async_get(
+                url, headers={"If-None-Match": response["ETag"]}
+            )
+            self.assertEqual(response.status_code, 304)
+
+    def test_book_list_matches_sync(self):
+        for data in [
+            {},
+            {"page": 2},
+            {"page": "last"},
+            {"cursor": ""},
+            {"author": self.authors[1].pk},
+            {"year_from": 1990, "year_to": 1999, "page": 2},
+        ]:
+            self.assertSameList(reverse("books"), data)
+
+    def test_book_list_cursor_walk_matches_sync(self):
+        cursor = ""
+        while cursor is not None:
+            page = self.assertSameList(reverse("books"), {"cursor": cursor})
+            cursor = page.next_cursor
+
+    def test_book_list_errors(self):
+        for data in [{"page": 99}, {"page": "first"}, {"cursor": "garbage"}]:
+            response = self.async_get(reverse("books"), data)
+            self.assertEqual(response.status_code, 404)
+
+    def test_book_list_page_cache(self):
+        response = self.async_get(reverse("books"))
+        with self.assertNumQueries(0):
+            cached = self.async_get(reverse("books"))
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(
+            self.client.get(reverse("books")).content, cached.content
+        )
+
+    def test_search_matches_sync(self):
+        for data in [
+            {"q": "Book"},
+            {"q": "Book", "page": 2},
+            {"q": "Book", "author": self.authors[0].pk},
+            {"q": "Bok", "mode": "fuzzy"},
+            {},
+        ]:
+            self.assertSameList(reverse("search"), data)
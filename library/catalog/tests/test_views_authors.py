@@ -7,6 +7,7 @@ django.setup()
 
 from catalog.models import Author, Book
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -27,6 +28,9 @@ class AuthorListViewTest(TestCase):
         ]
         cls.authors_number = len(Author.objects.all())
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_url_accessible(self):
         response = self.client.get(reverse("authors"))
         self.assertEqual(response.status_code, 200)
@@ -94,6 +98,9 @@ class AuthorDetailViewTest(TestCase):
         ]
         cls.books1_number = len(Book.objects.filter(author=cls.author1).all())
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_url_accesssible(self):
         response = self.client.get(
             reverse("author-detail", kwargs={"pk": self.author1.pk})
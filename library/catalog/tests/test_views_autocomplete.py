@@ -0,0 +1,158 @@
+import os
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog.autocomplete import index
+from catalog.models import Author, Book
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class AutocompleteViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.titles = [
+            "Война и мир",
+            "Мир полудня",
+            "Анна Каренина",
+            "Воскресение",
+        ]
+        cls.books = [
+            Book.objects.create(
+                title=title,
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i, title in enumerate(cls.titles)
+        ]
+
+    def setUp(self) -> None:
+        index.clear()
+
+    def labels(self, response):
+        return [item["label"] for item in response.json()["results"]]
+
+    def test_url_accessible(self):
+        response = self.client.get(reverse("search-autocomplete"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"results": []})
+
+    def test_prefix_matches_title_start(self):
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "вой"}
+        )
+        self.assertEqual(self.labels(response), ["Война и мир"])
+
+    def test_prefix_matches_any_word(self):
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "Мир"}
+        )
+        self.assertEqual(self.labels(response), ["Мир полудня", "Война и мир"])
+
+    def test_matches_authors(self):
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "толс"}
+        )
+        results = response.json()["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["type"], "author")
+        self.assertEqual(results[0]["id"], str(self.author.pk))
+        self.assertEqual(results[0]["url"], self.author.get_absolute_url())
+
+    def test_respects_limit(self):
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "в", "limit": 1}
+        )
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    @override_settings(AUTOCOMPLETE_LIMIT=2)
+    def test_limit_is_capped(self):
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "а", "limit": 100}
+        )
+        self.assertLessEqual(len(response.json()["results"]), 2)
+
+    def test_no_queries_after_build(self):
+        self.client.get(reverse("search-autocomplete"), {"q": "а"})
+        with self.assertNumQueries(0):
+            self.client.get(reverse("search-autocomplete"), {"q": "мир"})
+
+    def test_index_follows_saves_and_deletes(self):
+        self.client.get(reverse("search-autocomplete"), {"q": "а"})
+        book = self.books[0]
+        book.title = "Детство"
+        book.save()
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "дет"}
+        )
+        self.assertEqual(self.labels(response), ["Детство"])
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "вой"}
+        )
+        self.assertEqual(self.labels(response), [])
+        book.delete()
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "дет"}
+        )
+        self.assertEqual(self.labels(response), [])
+
+    def test_changes_during_build_kept(self):
+        values_list = Author.objects.values_list
+
+        def rename_during_build(*args, **kwargs):
+            # Книга переименована после того, как индекс прочитал названия.
+            book = self.books[0]
+            book.title = "Детство"
+            book.save()
+            return values_list(*args, **kwargs)
+
+        with mock.patch.object(
+            Author.objects, "values_list", rename_during_build
+        ):
+            index.build()
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "дет"}
+        )
+        self.assertEqual(self.labels(response), ["Детство"])
+        response = self.client.get(
+            reverse("search-autocomplete"), {"q": "вой"}
+        )
+        self.assertEqual(self.labels(response), [])
+
+    @override_settings(AUTOCOMPLETE_REFRESH_INTERVAL=0)
+    def test_stale_index_refreshed_in_background(self):
+        index.build()
+        with mock.patch("catalog.autocomplete.threading.Thread") as thread:
+            with self.assertNumQueries(0):
+                for _ in range(3):
+                    response = self.client.get(
+                        reverse("search-autocomplete"), {"q": "вой"}
+                    )
+                    self.assertEqual(self.labels(response), ["Война и мир"])
+        thread.assert_called_once_with(target=index._refresh, daemon=True)
+        with mock.patch("catalog.autocomplete.connections") as connections:
+            thread.call_args.kwargs["target"]()
+        connections.close_all.assert_called_once_with()
+        self.assertTrue(index._build_lock.acquire(blocking=False))
+        index._build_lock.release()
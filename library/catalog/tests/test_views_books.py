@@ -7,6 +7,7 @@ django.setup()
 
 from catalog.models import Author, Book
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -40,6 +41,9 @@ class BookListViewTest(TestCase):
         ]
         cls.books_number = len(Book.objects.all())
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_url_accessible(self):
         response = self.client.get(reverse("books"))
         self.assertEqual(response.status_code, 200)
@@ -85,6 +89,9 @@ class BookDetailViewTest(TestCase):
             added_by=cls.user1,
         )
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_url_accessible(self):
         response = self.client.get(
             reverse("book-detail", kwargs={"pk": self.book1.pk})
@@ -0,0 +1,181 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+import uuid
+
+from catalog.autocomplete import index
+from catalog.models import (
+    Author,
+    Book,
+    BookComment,
+    BookRating,
+    BookTrending,
+)
+from catalog.search import get_search_backend
+from catalog.serializers import BookCommentWriteSerializer
+from catalog.views import BulkWriteAPIView
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class BulkWriteAPITest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self) -> None:
+        self.client.force_login(self.user)
+
+    def post(self, name, data):
+        return self.client.post(
+            reverse(name), data, content_type="application/json"
+        )
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        for name in ["books-bulk", "ratings-bulk", "comments-bulk"]:
+            response = self.post(name, [])
+            self.assertEqual(response.status_code, 403)
+
+    def test_expects_list(self):
+        response = self.post("ratings-bulk", {"book": str(self.books[0].pk)})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BULK_WRITE_MAX_ITEMS=2)
+    def test_max_items(self):
+        items = [{"book": str(book.pk), "rate": 5} for book in self.books]
+        response = self.post("ratings-bulk", items)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BookRating.objects.exists())
+
+    def test_create_books(self):
+        index.clear()
+        items = [
+            {
+                "title": f"Новая книга {i}",
+                "author": str(self.author.pk),
+                "summary": "Lorem ipsum dolor sit amet",
+                "publication_year": 2000 + i,
+            }
+            for i in range(3)
+        ]
+        items.append({**items[0], "publication_year": 3000})
+        items.append({**items[0], "author": str(uuid.uuid4())})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post("books-bulk", items)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created"] * 3 + ["invalid"] * 2,
+        )
+        self.assertIn("publication_year", results[3]["errors"])
+        self.assertIn("author", results[4]["errors"])
+        book = Book.objects.get(pk=results[0]["id"])
+        self.assertEqual(book.title, "Новая книга 0")
+        self.assertEqual(book.added_by, self.user)
+        self.assertEqual(Book.objects.count(), 8)
+        found = get_search_backend().search(Book.objects.all(), "новая")
+        self.assertEqual(found.count(), 3)
+        autocomplete = self.client.get(
+            reverse("search-autocomplete"), {"q": "нов"}
+        ).json()["results"]
+        self.assertEqual(len(autocomplete), 3)
+
+    def test_upsert_ratings(self):
+        BookRating.objects.create(book=self.books[0], user=self.user, rate=1)
+        items = [
+            {"book": str(self.books[0].pk), "rate": 5},
+            {"book": str(self.books[1].pk), "rate": 4},
+            {"book": str(self.books[1].pk), "rate": 2},
+            {"book": str(self.books[2].pk), "rate": 6},
+            {"book": str(uuid.uuid4()), "rate": 3},
+            "garbage",
+        ]
+        response = self.post("ratings-bulk", items)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["updated", "created", "updated", "invalid", "invalid", "invalid"],
+        )
+        self.assertEqual(results[1]["id"], results[2]["id"])
+        self.assertEqual(BookRating.objects.count(), 2)
+        for book, rate in [(self.books[0], 5), (self.books[1], 2)]:
+            book.refresh_from_db()
+            self.assertEqual(book.rating_count, 1)
+            self.assertEqual(book.rating_sum, rate)
+            self.assertTrue(BookTrending.objects.filter(book=book).exists())
+        self.assertFalse(
+            BookTrending.objects.filter(book=self.books[2]).exists()
+        )
+
+    def test_upsert_ratings_query_count(self):
+        items = [{"book": str(book.pk), "rate": 4} for book in self.books]
+        with CaptureQueriesContext(connection) as one_item:
+            self.post("ratings-bulk", items[:1])
+        with CaptureQueriesContext(connection) as many_items:
+            self.post("ratings-bulk", items)
+        self.assertEqual(
+            len(many_items.captured_queries), len(one_item.captured_queries)
+        )
+
+    def test_create_comments(self):
+        book = self.books[3]
+        updated_at = book.updated_at
+        items = [
+            {"book": str(book.pk), "content": f"content {i}"} for i in range(3)
+        ]
+        items.append({"book": str(book.pk), "content": ""})
+        response = self.post("comments-bulk", items)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created"] * 3 + ["invalid"],
+        )
+        comments = BookComment.objects.filter(book=book, user=self.user)
+        self.assertEqual(comments.count(), 3)
+        book.refresh_from_db()
+        self.assertGreater(book.updated_at, updated_at)
+
+    def test_all_invalid(self):
+        response = self.post("comments-bulk", [{"content": "content"}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["status"], "invalid")
+        self.assertFalse(BookComment.objects.exists())
+
+    def test_write_hook_required(self):
+        class IncompleteBulkWriteAPIView(BulkWriteAPIView):
+            serializer_class = BookCommentWriteSerializer
+
+        with self.assertRaises(TypeError):
+            IncompleteBulkWriteAPIView()
@@ -7,6 +7,7 @@ django.setup()
 
 from catalog.models import Author, Book, BookComment
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -65,6 +66,9 @@ class BookCommentViewTest(TestCase):
             for _ in range(10)
         ]
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_is_paginated(self):
         response = self.client.get(
             reverse("book-detail", kwargs={"pk": self.book1.pk})
@@ -0,0 +1,167 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog.models import Author, Book, BookComment, BookRating
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(3)
+        ]
+        cls.book = cls.books[0]
+
+    def urls(self):
+        return [
+            self.book.get_absolute_url(),
+            self.author.get_absolute_url(),
+            "/api/v1/books/",
+            f"/api/v1/books/{self.book.pk}/",
+        ]
+
+    def assertNotModified(self, url, response, **headers):
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"], **headers
+        )
+        self.assertEqual(response.status_code, 304, url)
+        self.assertEqual(response.content, b"")
+
+    def assertModified(self, url, response, **headers):
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"], **headers
+        )
+        self.assertEqual(response.status_code, 200, url)
+
+    def test_not_modified(self):
+        for url in self.urls():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotModified(url, response)
+
+    def test_not_modified_since(self):
+        for url in self.urls():
+            if url == "/api/v1/books/":
+                continue
+            response = self.client.get(url)
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            )
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_list_validator_from_page(self):
+        url = "/api/v1/books/?page_size=1"
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+        self.books[2].title = "Book 2 renamed"
+        self.books[2].save()
+        self.assertNotModified(url, response)
+        self.book.save()
+        self.assertModified(url, response)
+
+    def test_list_cursor_page_reads_only_page(self):
+        url = "/api/v1/books/?cursor="
+        response = self.client.get(url)
+        with self.assertNumQueries(1):
+            self.assertNotModified(url, response)
+
+    def test_not_modified_skips_rendering(self):
+        response = self.client.get(self.book.get_absolute_url())
+        with self.assertNumQueries(1):
+            self.assertNotModified(self.book.get_absolute_url(), response)
+
+    def test_book_change(self):
+        responses = {url: self.client.get(url) for url in self.urls()}
+        self.book.title = "New title"
+        self.book.save()
+        for url, response in responses.items():
+            self.assertModified(url, response)
+
+    def test_author_change(self):
+        responses = {url: self.client.get(url) for url in self.urls()}
+        self.author.name = "New name"
+        self.author.save()
+        for url, response in responses.items():
+            self.assertModified(url, response)
+
+    def test_rating_and_comment_change(self):
+        url = self.book.get_absolute_url()
+        response = self.client.get(url)
+        rating = BookRating.objects.create(
+            book=self.book, user=self.user, rate=5
+        )
+        self.assertModified(url, response)
+        response = self.client.get(url)
+        rating.delete()
+        self.assertModified(url, response)
+        response = self.client.get(url)
+        comment = BookComment.objects.create(
+            user=self.user, book=self.book, content="content"
+        )
+        self.assertModified(url, response)
+        response = self.client.get(url)
+        comment.delete()
+        self.assertModified(url, response)
+
+    def test_other_book_change(self):
+        url = f"/api/v1/books/{self.book.pk}/"
+        response = self.client.get(url)
+        list_response = self.client.get("/api/v1/books/")
+        BookRating.objects.create(book=self.books[1], user=self.user, rate=5)
+        self.assertNotModified(url, response)
+        self.assertModified("/api/v1/books/", list_response)
+
+    def test_book_deleted_from_list(self):
+        responses = {
+            url: self.client.get(url)
+            for url in [self.author.get_absolute_url(), "/api/v1/books/"]
+        }
+        self.books[2].delete()
+        for url, response in responses.items():
+            self.assertModified(url, response)
+
+    def test_etag_depends_on_query_and_user(self):
+        url = "/api/v1/books/"
+        response = self.client.get(url)
+        self.assertModified(url + "?fields=title", response)
+        url = self.book.get_absolute_url()
+        response = self.client.get(url)
+        self.client.force_login(self.user)
+        self.assertModified(url, response)
+
+    def test_missing_resource(self):
+        for url in [
+            f"/books/{self.author.pk}/",
+            f"/authors/{self.book.pk}/",
+            f"/api/v1/books/{self.author.pk}/",
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 404)
+            self.assertNotIn("ETag", response)
@@ -0,0 +1,136 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+import csv
+import json
+from io import StringIO
+
+from catalog.models import Author, Book, BookComment, BookRating
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class BookExportViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Книга, {i}",
+                author=cls.author,
+                summary="Lorem ipsum\ndolor sit amet",
+                publication_year=1860 + i,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(5)
+        ]
+        BookRating.objects.create(book=cls.books[0], user=cls.user, rate=4)
+        for i in range(2):
+            BookComment.objects.create(
+                user=cls.user, book=cls.books[1], content=f"content {i}"
+            )
+
+    def ndjson(self, params=None):
+        response = self.client.get(reverse("books-export"), params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_ndjson(self):
+        rows = self.ndjson()
+        self.assertEqual(len(rows), 5)
+        by_id = {row["id"]: row for row in rows}
+        rated = by_id[str(self.books[0].pk)]
+        self.assertEqual(rated["author_id"], str(self.author.pk))
+        self.assertEqual(rated["author_name"], "Лев Толстой")
+        self.assertEqual(rated["rating_count"], 1)
+        self.assertEqual(rated["rating_sum"], 4)
+        self.assertEqual(rated["average_rating"], 4.0)
+        self.assertEqual(rated["comment_count"], 0)
+        commented = by_id[str(self.books[1].pk)]
+        self.assertEqual(commented["comment_count"], 2)
+        self.assertIsNone(commented["average_rating"])
+        self.assertEqual(commented["summary"], "Lorem ipsum\ndolor sit amet")
+
+    def test_ordered_by_update_time(self):
+        updated = [row["updated_at"] for row in self.ndjson()]
+        self.assertEqual(updated, sorted(updated))
+
+    def test_csv(self):
+        response = self.client.get(reverse("books-export"), {"format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 5)
+        row = next(row for row in rows if row["id"] == str(self.books[1].pk))
+        self.assertEqual(row["title"], "Книга, 1")
+        self.assertEqual(row["summary"], "Lorem ipsum\ndolor sit amet")
+        self.assertEqual(row["comment_count"], "2")
+        self.assertEqual(row["average_rating"], "")
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_small_chunks(self):
+        self.assertEqual(len(self.ndjson()), 5)
+
+    def test_since(self):
+        since = self.ndjson()[-1]["updated_at"]
+        book = self.books[2]
+        book.title = "Новое название"
+        book.save()
+        rows = self.ndjson({"since": since})
+        self.assertEqual(rows[-1]["id"], str(book.pk))
+        self.assertEqual(rows[-1]["title"], "Новое название")
+        self.assertLess(len(rows), 5)
+
+    def test_since_includes_rating_and_comment_changes(self):
+        since = self.ndjson()[-1]["updated_at"]
+        BookRating.objects.create(book=self.books[3], user=self.user, rate=5)
+        BookComment.objects.create(
+            user=self.user, book=self.books[4], content="content"
+        )
+        ids = [row["id"] for row in self.ndjson({"since": since})]
+        self.assertEqual(
+            ids[-2:], [str(self.books[3].pk), str(self.books[4].pk)]
+        )
+
+    def test_since_includes_author_changes(self):
+        since = self.ndjson()[-1]["updated_at"]
+        self.author.name = "Л. Н. Толстой"
+        self.author.save()
+        rows = self.ndjson({"since": since})
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["author_name"], "Л. Н. Толстой")
+
+    def test_naive_since(self):
+        self.assertEqual(len(self.ndjson({"since": "2000-01-01T00:00:00"})), 5)
+        self.assertEqual(self.ndjson({"since": "2999-01-01T00:00:00"}), [])
+
+    def test_invalid_params(self):
+        for params in [
+            {"since": "yesterday"},
+            {"since": "2023-02-30T00:00:00"},
+            {"format": "xml"},
+        ]:
+            response = self.client.get(reverse("books-export"), params)
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,213 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog.models import Author, Book
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class BookFacetsViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.tolstoy = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Русский писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.chekhov = Author.objects.create(
+            name="Антон Чехов",
+            date_of_birth="1860-01-29",
+            bio="Русский писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.war_and_peace = Book.objects.create(
+            title="Война и мир",
+            author=cls.tolstoy,
+            summary="Роман",
+            publication_year=1869,
+            added_by=cls.user,
+        )
+        cls.anna_karenina = Book.objects.create(
+            title="Анна Каренина",
+            author=cls.tolstoy,
+            summary="Роман",
+            publication_year=1877,
+            added_by=cls.user,
+        )
+        cls.seagull = Book.objects.create(
+            title="Чайка",
+            author=cls.chekhov,
+            summary="Пьеса",
+            publication_year=1896,
+            added_by=cls.user,
+        )
+        cls.cherry_orchard = Book.objects.create(
+            title="Вишневый сад",
+            author=cls.chekhov,
+            summary="Пьеса",
+            publication_year=1904,
+            added_by=cls.user,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def facet(self, response, name, key, value):
+        for entry in response.context_data["facets"][name]:
+            if entry[key] == value:
+                return entry
+        return None
+
+    def test_filter_by_author(self):
+        response = self.client.get(
+            reverse("books"), {"author": str(self.chekhov.pk)}
+        )
+        self.assertEqual(
+            set(response.context_data["books"]),
+            {self.seagull, self.cherry_orchard},
+        )
+
+    def test_filter_by_year_range(self):
+        response = self.client.get(
+            reverse("books"), {"year_from": 1870, "year_to": 1899}
+        )
+        self.assertEqual(
+            set(response.context_data["books"]),
+            {self.anna_karenina, self.seagull},
+        )
+
+    def test_invalid_filters_ignored(self):
+        response = self.client.get(
+            reverse("books"),
+            {"author": "unknown", "year_from": 1900, "year_to": 1800},
+        )
+        self.assertEqual(
+            set(response.context_data["books"]), {self.cherry_orchard}
+        )
+
+    def test_facet_counts(self):
+        response = self.client.get(reverse("books"))
+        facets = response.context_data["facets"]
+        self.assertEqual(
+            [(entry["start"], entry["count"]) for entry in facets["decades"]],
+            [(1900, 1), (1890, 1), (1870, 1), (1860, 1)],
+        )
+        self.assertEqual(
+            [(entry["name"], entry["count"]) for entry in facets["authors"]],
+            [("Антон Чехов", 2), ("Лев Толстой", 2)],
+        )
+
+    def test_facet_counts_ignore_own_filter(self):
+        response = self.client.get(
+            reverse("books"),
+            {
+                "author": str(self.tolstoy.pk),
+                "year_from": 1870,
+                "year_to": 1879,
+            },
+        )
+        tolstoy = self.facet(response, "authors", "id", str(self.tolstoy.pk))
+        chekhov = self.facet(response, "authors", "id", str(self.chekhov.pk))
+        self.assertTrue(tolstoy["selected"])
+        self.assertEqual(tolstoy["count"], 1)
+        self.assertIsNone(chekhov)
+        decade = self.facet(response, "decades", "start", 1870)
+        self.assertTrue(decade["selected"])
+        self.assertEqual(
+            [
+                entry["start"]
+                for entry in response.context_data["facets"]["decades"]
+            ],
+            [1870, 1860],
+        )
+
+    def test_facet_links_keep_other_parameters(self):
+        response = self.client.get(reverse("search"), {"q": "роман"})
+        self.assertContains(
+            response,
+            f"?q=%D1%80%D0%BE%D0%BC%D0%B0%D0%BD&amp;author={self.tolstoy.pk}",
+        )
+        self.assertContains(response, "year_from=1860&amp;year_to=1869")
+
+    def test_search_facets_count_search_results(self):
+        response = self.client.get(reverse("search"), {"q": "пьеса"})
+        facets = response.context_data["facets"]
+        self.assertEqual(
+            [(entry["name"], entry["count"]) for entry in facets["authors"]],
+            [("Антон Чехов", 2)],
+        )
+
+    def test_search_filtered_by_facets(self):
+        response = self.client.get(
+            reverse("search"), {"q": "пьеса", "year_to": 1899}
+        )
+        self.assertEqual(list(response.context_data["books"]), [self.seagull])
+
+    def test_catalog_summary_cached(self):
+        self.client.get(reverse("books"))
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse("books"), {"author": str(self.tolstoy.pk)})
+        self.assertFalse(
+            any(
+                "GROUP BY" in query["sql"]
+                for query in context.captured_queries
+            )
+        )
+
+    def test_catalog_summary_invalidated(self):
+        self.client.get(reverse("books"))
+        Book.objects.create(
+            title="Воскресение",
+            author=self.tolstoy,
+            summary="Роман",
+            publication_year=1899,
+            added_by=self.user,
+        )
+        response = self.client.get(reverse("books"))
+        tolstoy = self.facet(response, "authors", "id", str(self.tolstoy.pk))
+        self.assertEqual(tolstoy["count"], 3)
+
+    def test_search_facets_cached(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("search"), {"q": "пьеса"})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("search"), {"q": "пьеса", "year_to": 1899}
+            )
+        self.assertFalse(
+            any(
+                "GROUP BY" in query["sql"]
+                for query in context.captured_queries
+            )
+        )
+        chekhov = self.facet(response, "authors", "id", str(self.chekhov.pk))
+        self.assertEqual(chekhov["count"], 1)
+
+    def test_search_facets_invalidated(self):
+        self.client.get(reverse("search"), {"q": "пьеса"})
+        Book.objects.create(
+            title="Три сестры",
+            author=self.chekhov,
+            summary="Пьеса",
+            publication_year=1900,
+            added_by=self.user,
+        )
+        response = self.client.get(reverse("search"), {"q": "пьеса"})
+        chekhov = self.facet(response, "authors", "id", str(self.chekhov.pk))
+        self.assertEqual(chekhov["count"], 3)
@@ -7,7 +7,10 @@ django.setup()
 
 from catalog.models import Author, Book, BookRating
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 User = get_user_model()
@@ -52,6 +55,9 @@ class IndexViewTest(TestCase):
             Book.objects.exclude(rating__isnull=True).distinct()
         )
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_url_accessible(self):
         response = self.client.get(reverse("index"))
         self.assertEqual(response.status_code, 200)
@@ -73,13 +79,42 @@ class IndexViewTest(TestCase):
             self.rated_number // 6 + (0 if self.rated_number % 6 == 0 else 1),
         )
 
-    def test_books_ordered_by_avgerage_rate(self):
+    def test_books_ordered_by_trending_score(self):
+        response = self.client.get(reverse("index"))
+        scores = [
+            book.trending.score for book in response.context_data["books"]
+        ]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_many_votes_beat_single_top_vote(self):
+        book = Book.objects.create(
+            title="Single vote",
+            author=self.author,
+            summary="Lorem ipsum dolor sit amet",
+            publication_year=2023,
+            added_by=self.users[0],
+        )
+        BookRating.objects.create(book=book, user=self.users[0], rate=5)
         response = self.client.get(reverse("index"))
+        books = list(response.context_data["books"])
+        self.assertLess(books.index(self.books[1]), books.index(book))
+
+    def test_queries_number_independent_of_catalog_size(self):
+        with CaptureQueriesContext(connection) as small_catalog:
+            self.client.get(reverse("index"))
+        for i in range(12, 60):
+            book = Book.objects.create(
+                title=f"Book {i}",
+                author=self.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                added_by=self.users[0],
+            )
+            BookRating.objects.create(book=book, user=self.users[0], rate=3)
+        with CaptureQueriesContext(connection) as large_catalog:
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.context_data["paginator"].count, 58)
         self.assertEqual(
-            response.context_data["books"],
-            sorted(
-                response.context_data["books"],
-                key=lambda book: book.average_rating,
-                reverse=True,
-            ),
+            len(large_catalog.captured_queries),
+            len(small_catalog.captured_queries),
         )
@@ -0,0 +1,352 @@
+import os
+from hashlib import md5
+from unittest import mock, skipUnless
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from catalog import caching
+from catalog.models import Author, Book, BookComment, BookRating
+from catalog.templatetags import catalog_extras
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.authors = [
+            Author.objects.create(
+                name=f"Author {i}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            for i in range(2)
+        ]
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.authors[i % 2],
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(4)
+        ]
+        cls.book = cls.books[0]
+        BookRating.objects.create(book=cls.book, user=cls.user, rate=4)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def urls(self):
+        return [
+            reverse("index"),
+            reverse("books"),
+            reverse("authors"),
+            self.book.get_absolute_url(),
+            self.authors[0].get_absolute_url(),
+        ]
+
+    def assertCached(self, url):
+        # Страницы книги и автора читают версию для условного GET.
+        lists = [
+            reverse("index"),
+            reverse("books"),
+            reverse("authors"),
+            reverse("search"),
+        ]
+        queries = 0 if url.split("?")[0] in lists else 1
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertRebuilt(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(hasattr(response, "context_data"), url)
+        return response
+
+    def test_anonymous_pages_cached(self):
+        for url in self.urls():
+            first = self.assertRebuilt(url)
+            second = self.assertCached(url)
+            self.assertEqual(second.content, first.content)
+
+    def test_authenticated_not_cached(self):
+        self.client.force_login(self.user)
+        for url in self.urls():
+            self.client.get(url)
+            self.assertRebuilt(url)
+
+    def test_query_string_cached_separately(self):
+        self.client.get(reverse("books"))
+        url = f"{reverse('books')}?author={self.authors[1].pk}"
+        self.assertNotContains(self.assertRebuilt(url), self.book.title)
+        self.assertCached(url)
+
+    def test_book_change(self):
+        for url in self.urls():
+            self.client.get(url)
+        self.client.get(self.books[1].get_absolute_url())
+        self.book.title = "Renamed"
+        self.book.save()
+        for url in [
+            reverse("index"),
+            reverse("books"),
+            self.book.get_absolute_url(),
+            self.authors[0].get_absolute_url(),
+        ]:
+            self.assertContains(self.assertRebuilt(url), "Renamed")
+        self.assertCached(reverse("authors"))
+        self.assertCached(self.books[1].get_absolute_url())
+
+    def test_book_moved_to_another_author(self):
+        old, new = (author.get_absolute_url() for author in self.authors)
+        self.client.get(old)
+        self.client.get(new)
+        book = Book.objects.get(pk=self.book.pk)
+        book.author = self.authors[1]
+        book.save()
+        self.assertNotContains(self.assertRebuilt(old), book.title)
+        self.assertContains(self.assertRebuilt(new), book.title)
+
+    def test_author_change(self):
+        for url in self.urls():
+            self.client.get(url)
+        self.client.get(self.books[1].get_absolute_url())
+        author = self.authors[0]
+        author.name = "Renamed"
+        author.save()
+        for url in [
+            reverse("books"),
+            reverse("authors"),
+            self.book.get_absolute_url(),
+            author.get_absolute_url(),
+        ]:
+            self.assertContains(self.assertRebuilt(url), "Renamed")
+        self.assertCached(self.books[1].get_absolute_url())
+
+    def test_comment_change(self):
+        url = self.book.get_absolute_url()
+        self.client.get(url)
+        self.client.get(self.books[1].get_absolute_url())
+        comment = BookComment.objects.create(
+            user=self.user, book=self.book, content="New comment"
+        )
+        self.assertContains(self.assertRebuilt(url), "New comment")
+        comment.delete()
+        self.assertNotContains(self.assertRebuilt(url), "New comment")
+        self.assertCached(self.books[1].get_absolute_url())
+
+    def test_rating_change(self):
+        url = self.book.get_absolute_url()
+        self.client.get(url)
+        self.client.get(reverse("index"))
+        BookRating.objects.upsert(book=self.book, user=self.user, rate=2)
+        self.assertContains(self.assertRebuilt(url), "Рейтинг: 2")
+        self.assertRebuilt(reverse("index"))
+        BookRating.objects.filter(book=self.book).delete()
+        self.assertContains(self.assertRebuilt(url), "Отсутствует")
+
+    def test_bulk_comments_invalidate(self):
+        url = self.book.get_absolute_url()
+        self.client.get(url)
+        BookComment.objects.bulk_create(
+            [BookComment(user=self.user, book=self.book, content="Bulk")]
+        )
+        Book.touch(self.book.pk)
+        self.assertContains(self.assertRebuilt(url), "Bulk")
+
+    def hold_lock(self, url):
+        key = md5(f"http://testserver{url}".encode()).hexdigest()
+        key = f"{caching.PAGE_KEY_PREFIX}{key}"
+        self.assertTrue(caching._acquire(key))
+        self.addCleanup(caching._release, key)
+        return key
+
+    def test_search_cached(self):
+        url = f"{reverse('search')}?q=Book"
+        self.assertContains(self.assertRebuilt(url), self.book.title)
+        self.assertCached(url)
+        self.book.title = "Book renamed"
+        self.book.save()
+        self.assertContains(self.assertRebuilt(url), "renamed")
+
+    def test_stale_served_while_rebuilding(self):
+        for url, scope in [
+            (reverse("index"), "trending"),
+            (f"{reverse('search')}?q=Book", "books"),
+        ]:
+            first = self.assertRebuilt(url)
+            caching.invalidate(scope)
+            key = self.hold_lock(url)
+            stale = self.assertCached(url)
+            self.assertEqual(stale.content, first.content)
+            caching._release(key)
+            self.assertRebuilt(url)
+            self.assertCached(url)
+
+    def test_only_stale_pages_locked(self):
+        url = reverse("books")
+        self.client.get(url)
+        caching.invalidate("books")
+        self.hold_lock(url)
+        self.assertRebuilt(url)
+
+    def test_stats(self):
+        url = reverse("cache-stats")
+        self.client.get(reverse("books"))
+        self.client.get(reverse("books"))
+        self.client.get(reverse("authors"))
+        self.client.get(reverse("index"))
+        caching.invalidate("trending")
+        self.hold_lock(reverse("index"))
+        self.client.get(reverse("index"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(
+            User.objects.create_superuser(
+                username="admin", password="password", email="a@email.com"
+            )
+        )
+        pages = self.client.get(url).json()["pages"]
+        self.assertEqual(pages["hits"], 1)
+        self.assertEqual(pages["misses"], 3)
+        self.assertEqual(pages["stale"], 1)
+        self.assertEqual(pages["hit_ratio"], round(1 / 5, 4))
+
+
+class CardFragmentCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.authors = [
+            Author.objects.create(
+                name=f"Author {i}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            for i in range(2)
+        ]
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.authors[i % 2],
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(4)
+        ]
+        for book in cls.books:
+            BookRating.objects.create(book=book, user=cls.user, rate=4)
+
+    def setUp(self) -> None:
+        cache.clear()
+        # Страницы авторизованного пользователя не кэшируются целиком.
+        self.client.force_login(self.user)
+
+    def get(self, url):
+        with mock.patch.object(
+            catalog_extras,
+            "render_to_string",
+            wraps=catalog_extras.render_to_string,
+        ) as render:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, render.call_count
+
+    def test_cards_cached(self):
+        for url, cards in [
+            (reverse("index"), 4),
+            (reverse("books"), 4),
+            (reverse("authors"), 2),
+            (reverse("profile"), 4),
+            (self.authors[0].get_absolute_url(), 2),
+        ]:
+            cache.clear()
+            first, rendered = self.get(url)
+            self.assertEqual(rendered, cards, url)
+            second, rendered = self.get(url)
+            self.assertEqual(rendered, 0, url)
+            self.assertEqual(second.content, first.content)
+
+    @skipUnless(connection.vendor == "postgresql", "Требуется PostgreSQL")
+    def test_fuzzy_search_cards_cached(self):
+        url = f"{reverse('search')}?q=Bok&mode=fuzzy"
+        first, rendered = self.get(url)
+        self.assertEqual(rendered, 4)
+        second, rendered = self.get(url)
+        self.assertEqual(rendered, 0)
+        self.assertEqual(second.content, first.content)
+
+    def test_cards_shared_between_pages(self):
+        self.get(reverse("books"))
+        self.assertEqual(self.get(reverse("index"))[1], 0)
+        self.assertEqual(self.get(reverse("profile"))[1], 0)
+
+    def test_author_page_cards_without_author_link(self):
+        self.get(reverse("books"))
+        url = self.authors[0].get_absolute_url()
+        response, rendered = self.get(url)
+        self.assertEqual(rendered, 2)
+        self.assertNotContains(response, f'href="{url}"')
+        self.assertContains(self.get(reverse("books"))[0], f'href="{url}"')
+
+    def test_single_cache_lookup(self):
+        self.get(reverse("books"))
+        with mock.patch(
+            "catalog.caching.cache.get_many", wraps=cache.get_many
+        ) as get_many:
+            self.get(reverse("books"))
+        self.assertEqual(get_many.call_count, 1)
+
+    def test_book_change(self):
+        self.get(reverse("books"))
+        book = self.books[0]
+        book.title = "Renamed"
+        book.save()
+        response, rendered = self.get(reverse("books"))
+        self.assertEqual(rendered, 1)
+        self.assertContains(response, "Renamed")
+
+    def test_author_change(self):
+        self.get(reverse("books"))
+        self.get(reverse("authors"))
+        author = self.authors[0]
+        author.name = "Renamed"
+        author.save()
+        response, rendered = self.get(reverse("books"))
+        self.assertEqual(rendered, 2)
+        self.assertContains(response, "Renamed</a>", count=2)
+        response, rendered = self.get(reverse("authors"))
+        self.assertEqual(rendered, 1)
+        self.assertContains(response, "Renamed")
+
+    def test_search_headlines_not_cached(self):
+        response = self.client.get(reverse("search"), {"q": "Book"})
+        self.assertContains(response, "<mark>Book</mark>")
+        response = self.client.get(reverse("search"), {"q": "Lorem"})
+        self.assertContains(response, "<mark>Lorem</mark>")
+        self.assertNotContains(response, "<mark>Book</mark>")
@@ -0,0 +1,263 @@
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from catalog.models import Author, Book, BookComment
+from catalog.pagination import EstimatedCountPaginator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class KeysetPaginationViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.authors = [
+            Author.objects.create(
+                name=f"Author {i % 3}",
+                date_of_birth="1990-01-01",
+                bio="Lorem ipsum dolor sit amet",
+                photo="authors/photo.jpg",
+            )
+            for i in range(8)
+        ]
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i % 4}",
+                author=cls.authors[i % 2],
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2023,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(16)
+        ]
+        cls.book = cls.books[0]
+        cls.comments = [
+            BookComment.objects.create(
+                user=cls.user, book=cls.book, content=f"content {i}"
+            )
+            for i in range(14)
+        ]
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def walk(self, url, name):
+        pages = []
+        response = self.client.get(url, {"cursor": ""})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(list(response.context_data[name]))
+            cursor = response.context_data["page_obj"].next_cursor
+            if cursor is None:
+                break
+            response = self.client.get(url, {"cursor": cursor})
+        backwards = [pages[-1]]
+        while True:
+            cursor = response.context_data["page_obj"].previous_cursor
+            if cursor is None:
+                break
+            response = self.client.get(url, {"cursor": cursor})
+            backwards.append(list(response.context_data[name]))
+        self.assertEqual(backwards, pages[::-1])
+        return [obj for page in pages for obj in page]
+
+    def test_books_walk(self):
+        expected = list(Book.objects.order_by("title", "author__name", "id"))
+        self.assertEqual(self.walk(reverse("books"), "books"), expected)
+
+    def test_authors_walk(self):
+        expected = list(Author.objects.order_by("name", "id"))
+        self.assertEqual(self.walk(reverse("authors"), "authors"), expected)
+
+    def test_author_books_walk(self):
+        author = self.authors[0]
+        expected = list(
+            Book.objects.filter(author=author).order_by("title", "id")
+        )
+        self.assertEqual(
+            self.walk(author.get_absolute_url(), "object_list"), expected
+        )
+
+    def test_comments_walk(self):
+        expected = list(
+            BookComment.objects.filter(book=self.book).order_by(
+                "-created_at", "id"
+            )
+        )
+        self.assertEqual(
+            self.walk(self.book.get_absolute_url(), "object_list"), expected
+        )
+
+    def test_next_link_switches_to_cursor_mode(self):
+        response = self.client.get(reverse("books"), {"page": 2})
+        page = response.context_data["page_obj"]
+        self.assertContains(response, f"cursor={page.next_cursor}")
+        response = self.client.get(
+            reverse("books"), {"cursor": page.next_cursor}
+        )
+        expected = list(
+            Book.objects.order_by("title", "author__name", "id")[12:16]
+        )
+        self.assertEqual(list(response.context_data["books"]), expected)
+
+    def test_cursor_mode_skips_count(self):
+        response = self.client.get(reverse("books"), {"cursor": ""})
+        cursor = response.context_data["page_obj"].next_cursor
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse("books"), {"cursor": cursor})
+        for query in context.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"])
+            self.assertNotIn("OFFSET", query["sql"])
+
+    def test_invalid_cursor(self):
+        for cursor in ["garbage", "WzAsWzFdXQ", "WzAsWyJhIiwiYiIsIngiXV0"]:
+            response = self.client.get(reverse("books"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_api_cursor_mode(self):
+        expected = [
+            str(book.pk)
+            for book in Book.objects.order_by("title", "author__name", "id")
+        ]
+        ids = []
+        url = "/api/v1/books/?cursor="
+        while url:
+            data = self.client.get(url).json()
+            self.assertNotIn("count", data)
+            ids.extend(book["id"] for book in data["results"])
+            url = data["next"]
+        self.assertEqual(ids, expected)
+
+    def test_api_page_mode_unchanged(self):
+        data = self.client.get("/api/v1/books/").json()
+        self.assertEqual(data["count"], len(self.books))
+        self.assertEqual(len(data["results"]), 6)
+
+    def test_api_invalid_cursor(self):
+        response = self.client.get("/api/v1/books/", {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_superuser(
+            username="admin",
+            password="password",
+            email="admin@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Author",
+            date_of_birth="1990-01-01",
+            bio="Lorem ipsum dolor sit amet",
+            photo="authors/photo.jpg",
+        )
+        cls.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author=cls.author,
+                summary="Lorem ipsum dolor sit amet",
+                publication_year=2000 + i,
+                poster=f"posters/book{i}.jpg",
+                added_by=cls.user,
+            )
+            for i in range(20)
+        ]
+
+    def count_queries(self, paginator):
+        with CaptureQueriesContext(connection) as context:
+            count = paginator.count
+        return count, [query["sql"] for query in context.captured_queries]
+
+    def test_exact_count_below_threshold(self):
+        paginator = EstimatedCountPaginator(Book.objects.all(), 6)
+        count, queries = self.count_queries(paginator)
+        self.assertEqual(count, 20)
+        self.assertTrue(any("COUNT(*)" in sql for sql in queries))
+
+    @skipUnless(connection.vendor == "postgresql", "Требуется PostgreSQL")
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_table_estimate_above_threshold(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE catalog_book")
+        paginator = EstimatedCountPaginator(Book.objects.all(), 6)
+        count, queries = self.count_queries(paginator)
+        self.assertEqual(count, 20)
+        self.assertEqual(len(queries), 1)
+        self.assertIn("reltuples", queries[0])
+
+    @skipUnless(connection.vendor == "postgresql", "Требуется PostgreSQL")
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_filtered_estimate_above_threshold(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE catalog_book")
+        paginator = EstimatedCountPaginator(
+            Book.objects.filter(publication_year__gte=2010), 6
+        )
+        count, queries = self.count_queries(paginator)
+        self.assertGreater(count, 0)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith("EXPLAIN"))
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_empty_queryset(self):
+        paginator = EstimatedCountPaginator(Book.objects.none(), 6)
+        count, queries = self.count_queries(paginator)
+        self.assertEqual(count, 0)
+        self.assertEqual(queries, [])
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=10**9)
+    def test_exact_count_for_small_estimate(self):
+        paginator = EstimatedCountPaginator(
+            Book.objects.filter(publication_year__gte=2010), 6
+        )
+        self.assertEqual(paginator.count, 10)
+
+    def test_async_count(self):
+        paginator = EstimatedCountPaginator(
+            Book.objects.filter(publication_year__gte=2010), 6
+        )
+        self.assertEqual(async_to_sync(paginator.acount)(), 10)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 10)
+
+    def test_used_by_listings(self):
+        response = self.client.get(reverse("books"))
+        self.assertIsInstance(
+            response.context_data["paginator"], EstimatedCountPaginator
+        )
+        response = self.client.get(reverse("search"), {"q": "book"})
+        self.assertIsInstance(
+            response.context_data["paginator"], EstimatedCountPaginator
+        )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("profile"))
+        self.assertIsInstance(
+            response.context_data["paginator"], EstimatedCountPaginator
+        )
+
+    def test_used_by_admin(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("admin:catalog_book_changelist"))
+        changelist = response.context_data["cl"]
+        self.assertIsInstance(changelist.paginator, EstimatedCountPaginator)
+        self.assertEqual(changelist.result_count, 20)
+        self.assertIsNone(changelist.full_result_count)
@@ -59,3 +59,13 @@ class BookRatingViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.book1 = Book.objects.get(pk=self.book1.pk)
         self.assertEqual(self.book1.average_rating, 5)
+
+    def test_logged_in_user_can_change_rate(self):
+        self.client.login(username="user1", password="password1")
+        url = reverse("book-detail", kwargs={"pk": self.book1.pk})
+        self.client.post(url, {"rate": 5})
+        response = self.client.post(url, {"rate": 2})
+        self.assertEqual(response.status_code, 200)
+        self.book1 = Book.objects.get(pk=self.book1.pk)
+        self.assertEqual(self.book1.rating_count, 1)
+        self.assertEqual(self.book1.average_rating, 2)
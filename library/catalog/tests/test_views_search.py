@@ -5,13 +5,29 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
 django.setup()
 
+from unittest import skipUnless
+
 from catalog.models import Author, Book
+from catalog.search import (
+    PostgresSearchBackend,
+    SearchBackend,
+    SQLiteSearchBackend,
+    get_search_backend,
+)
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 User = get_user_model()
 
+postgresql_only = skipUnless(
+    connection.vendor == "postgresql", "Требуется PostgreSQL"
+)
+sqlite_only = skipUnless(connection.vendor == "sqlite", "Требуется SQLite")
+
 
 class SearchViewTest(TestCase):
     @classmethod
@@ -49,6 +65,9 @@ class SearchViewTest(TestCase):
         cls.author1_books_number = len(Book.objects.filter(author=cls.author1))
         cls.author2_books_number = len(Book.objects.filter(author=cls.author2))
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_url_accessible(self):
         response = self.client.get(reverse("search"))
         self.assertEqual(response.status_code, 200)
@@ -82,3 +101,270 @@ class SearchViewTest(TestCase):
             self.odd_books_number // 6
             + (0 if self.odd_books_number % 6 == 0 else 1),
         )
+
+
+class FullTextSearchViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Русский писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.other_author = Author.objects.create(
+            name="Другой автор",
+            date_of_birth="1900-01-01",
+            bio="Писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.war_and_peace = Book.objects.create(
+            title="Война и мир",
+            author=cls.author,
+            summary="Роман-эпопея о жизни русского общества",
+            publication_year=1869,
+            added_by=cls.user,
+        )
+        cls.about_war = Book.objects.create(
+            title="Рассказы & очерки",
+            author=cls.other_author,
+            summary="Сборник рассказов о войне <script>",
+            publication_year=1900,
+            added_by=cls.user,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    @postgresql_only
+    def test_matches_word_forms(self):
+        response = self.client.get(reverse("search"), {"q": "войны"})
+        self.assertEqual(
+            set(response.context_data["books"]),
+            {self.war_and_peace, self.about_war},
+        )
+
+    @postgresql_only
+    def test_title_match_ranked_first(self):
+        response = self.client.get(reverse("search"), {"q": "войны"})
+        self.assertEqual(
+            list(response.context_data["books"]),
+            [self.war_and_peace, self.about_war],
+        )
+
+    def test_searchable_by_summary(self):
+        response = self.client.get(reverse("search"), {"q": "эпопея"})
+        self.assertEqual(
+            list(response.context_data["books"]), [self.war_and_peace]
+        )
+
+    @postgresql_only
+    def test_matches_are_highlighted(self):
+        response = self.client.get(reverse("search"), {"q": "война"})
+        self.assertContains(response, "<mark>Война</mark> и мир")
+        self.assertContains(response, "Рассказы &amp; очерки")
+        self.assertContains(response, "о <mark>войне</mark>")
+        self.assertNotContains(response, "<script>")
+
+    def test_search_vector_follows_author_rename(self):
+        self.author.name = "Лев Николаевич Толстой"
+        self.author.save()
+        response = self.client.get(reverse("search"), {"q": "николаевич"})
+        self.assertEqual(
+            list(response.context_data["books"]), [self.war_and_peace]
+        )
+
+
+@postgresql_only
+class FuzzySearchViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Русский писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.other_author = Author.objects.create(
+            name="Федор Достоевский",
+            date_of_birth="1821-11-11",
+            bio="Русский писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.war_and_peace = Book.objects.create(
+            title="Война и мир",
+            author=cls.author,
+            summary="Роман-эпопея",
+            publication_year=1869,
+            added_by=cls.user,
+        )
+        cls.idiot = Book.objects.create(
+            title="Идиот",
+            author=cls.other_author,
+            summary="Роман",
+            publication_year=1869,
+            added_by=cls.user,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_finds_misspelled_title(self):
+        response = self.client.get(
+            reverse("search"), {"q": "вайна и мир", "mode": "fuzzy"}
+        )
+        self.assertEqual(
+            list(response.context_data["books"]), [self.war_and_peace]
+        )
+
+    def test_finds_misspelled_author_name(self):
+        response = self.client.get(
+            reverse("search"), {"q": "достаевский", "mode": "fuzzy"}
+        )
+        self.assertEqual(list(response.context_data["books"]), [self.idiot])
+
+    def test_full_text_search_suggests_fuzzy_mode(self):
+        response = self.client.get(reverse("search"), {"q": "вайна и мир"})
+        self.assertEqual(len(response.context_data["books"]), 0)
+        self.assertContains(response, "mode=fuzzy")
+
+    @override_settings(SEARCH_TRIGRAM_THRESHOLD=0.95)
+    def test_threshold_configurable(self):
+        response = self.client.get(
+            reverse("search"), {"q": "вайна и мир", "mode": "fuzzy"}
+        )
+        self.assertEqual(len(response.context_data["books"]), 0)
+
+    def test_uses_trigram_indexes(self):
+        # На нескольких строках полный проход дешевле любого индекса,
+        # поэтому такие планы отключаются, а B-tree индексы для
+        # постраничного вывода, которые планировщик читает целиком вместо
+        # таблицы, удаляются внутри транзакции теста. Так проверяется, что
+        # условия поиска совпадают с выражениями триграммных индексов.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DROP INDEX author_name_id_idx, book_title_id_idx, "
+                "book_author_title_id_idx"
+            )
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+        plan = (
+            PostgresSearchBackend()
+            .fuzzy_search(Book.objects.all(), "вайна и мир")
+            .explain()
+        )
+        self.assertIn("book_title_upper_gin_idx", plan)
+        self.assertIn("author_name_upper_gin_idx", plan)
+
+    def test_threshold_set_on_connection(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.word_similarity_threshold")
+            threshold = cursor.fetchone()[0]
+        self.assertEqual(float(threshold), settings.SEARCH_TRIGRAM_THRESHOLD)
+        with self.assertNumQueries(0):
+            PostgresSearchBackend().fuzzy_search(Book.objects.all(), "мир")
+
+
+class SearchBackendTest(TestCase):
+    @postgresql_only
+    def test_postgresql_backend_selected(self):
+        self.assertIsInstance(get_search_backend(), PostgresSearchBackend)
+
+    @sqlite_only
+    def test_sqlite_backend_selected(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+    @override_settings(SEARCH_BACKEND="catalog.search.SearchBackend")
+    def test_backend_configurable(self):
+        self.assertIs(type(get_search_backend()), SearchBackend)
+
+
+@sqlite_only
+class SQLiteSearchViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            username="user",
+            password="password",
+            email="user@email.com",
+        )
+        cls.author = Author.objects.create(
+            name="Лев Толстой",
+            date_of_birth="1828-09-09",
+            bio="Русский писатель",
+            photo="authors/photo.jpg",
+        )
+        cls.book = Book.objects.create(
+            title="Война и мир",
+            author=cls.author,
+            summary="Роман-эпопея о жизни русского общества",
+            publication_year=1869,
+            added_by=cls.user,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get(reverse("search"), {"q": query})
+        return list(response.context_data["books"])
+
+    def test_matches_word_prefixes(self):
+        self.assertEqual(self.search("эпоп русск"), [self.book])
+        self.assertEqual(self.search("эпопея мир"), [self.book])
+        self.assertEqual(self.search("эпопея идиот"), [])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('"мир" -(эпопея'), [self.book])
+        self.assertEqual(self.search("***"), [])
+
+    def test_title_match_ranked_first(self):
+        other_book = Book.objects.create(
+            title="Рассказы",
+            author=self.author,
+            summary="Сборник рассказов о войне и мире",
+            publication_year=1900,
+            added_by=self.user,
+        )
+        self.assertEqual(self.search("мир"), [self.book, other_book])
+
+    def test_index_follows_book_changes(self):
+        self.book.title = "Анна Каренина"
+        self.book.save()
+        self.assertEqual(self.search("каренина"), [self.book])
+        self.assertEqual(self.search("война"), [])
+        self.book.delete()
+        self.assertEqual(self.search("каренина"), [])
+
+    def test_index_follows_author_rename(self):
+        self.author.name = "Лев Николаевич Толстой"
+        self.author.save()
+        self.assertEqual(self.search("николаевич"), [self.book])
+
+    def test_matches_are_highlighted(self):
+        response = self.client.get(reverse("search"), {"q": "мир эпоп"})
+        self.assertContains(response, "Война и <mark>мир</mark>")
+        self.assertContains(response, "Роман-<mark>эпопея</mark> о жизни")
+
+    def test_fuzzy_mode_not_offered(self):
+        response = self.client.get(
+            reverse("search"), {"q": "вайна", "mode": "fuzzy"}
+        )
+        self.assertFalse(response.context_data["fuzzy"])
+        self.assertNotContains(response, "mode=fuzzy")
+
+    def test_uses_fts_index(self):
+        plan = (
+            SQLiteSearchBackend().search(Book.objects.all(), "мир").explain()
+        )
+        self.assertIn("VIRTUAL TABLE", plan)
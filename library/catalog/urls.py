@@ -1,11 +1,28 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 
 from . import views
 
+if settings.ASYNC_VIEWS:
+    SearchView = views.AsyncSearchView
+    BookListView = views.AsyncBookListView
+    BooksListAPIView = views.AsyncBooksListAPIView
+    BooksRetrieveAPIView = views.AsyncBooksRetrieveAPIView
+else:
+    SearchView = views.SearchView
+    BookListView = views.BookListView
+    BooksListAPIView = views.BooksListAPIView
+    BooksRetrieveAPIView = views.BooksRetrieveAPIView
+
 urlpatterns = [
     path("", view=views.IndexView.as_view(), name="index"),
-    path("search", view=views.SearchView.as_view(), name="search"),
-    path("books/", view=views.BookListView.as_view(), name="books"),
+    path("search", view=SearchView.as_view(), name="search"),
+    path(
+        "search/autocomplete",
+        view=views.AutocompleteView.as_view(),
+        name="search-autocomplete",
+    ),
+    path("books/", view=BookListView.as_view(), name="books"),
     path(
         "books/create/",
         view=views.BookCreateView.as_view(),
@@ -37,6 +54,36 @@ urlpatterns = [
         view=views.AuthorDetailView.as_view(),
         name="author-detail",
     ),
-    path("api/v1/books/", view=views.BooksListAPIView.as_view()),
-    path("api/v1/books/<pk>/", view=views.BooksRetrieveAPIView.as_view()),
+    path("api/v1/books/", view=BooksListAPIView.as_view()),
+    re_path(
+        r"^api/v1/books/batch/?$",
+        view=views.BooksBatchAPIView.as_view(),
+        name="books-batch",
+    ),
+    path(
+        "api/v1/books/bulk/",
+        view=views.BooksBulkCreateAPIView.as_view(),
+        name="books-bulk",
+    ),
+    path(
+        "api/v1/books/export/",
+        view=views.BookExportView.as_view(),
+        name="books-export",
+    ),
+    path("api/v1/books/<pk>/", view=BooksRetrieveAPIView.as_view()),
+    path(
+        "api/v1/ratings/bulk/",
+        view=views.BookRatingsBulkUpsertAPIView.as_view(),
+        name="ratings-bulk",
+    ),
+    path(
+        "api/v1/comments/bulk/",
+        view=views.BookCommentsBulkCreateAPIView.as_view(),
+        name="comments-bulk",
+    ),
+    path(
+        "api/v1/cache/stats/",
+        view=views.CacheStatsAPIView.as_view(),
+        name="cache-stats",
+    ),
 ]
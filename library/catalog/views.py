@@ -1,62 +1,286 @@
+from abc import ABC, abstractmethod
+from asyncio import iscoroutine
 from typing import Any
+from uuid import UUID
 
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection, transaction
 from django.db.models.query import QuerySet
 from django.forms.models import BaseModelForm
 from django.http import (
+    Http404,
     HttpRequest,
     HttpResponse,
     HttpResponseForbidden,
     HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
 )
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views import generic
 from django.views.generic.list import MultipleObjectMixin
 from rest_framework import generics
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from . import autocomplete, caching, export
+from .caching import cache_anonymous_page, object_scope
+from .conditional import (
+    author_version,
+    book_version,
+    conditional,
+    conditional_page,
+)
+from .facets import (
+    build_facets,
+    bump_catalog_version,
+    catalog_facet_rows,
+    facet_rows,
+    search_facet_rows,
+)
+from .forms import BookCommentForm, BookFilterForm, BookForm, BookRatingForm
+from .models import Author, Book, BookComment, BookRating
+from .pagination import (
+    AsyncPaginationMixin,
+    EstimatedCountPaginator,
+    KeysetPaginationMixin,
+    KeysetResultsSetPagination,
+)
+from .search import SearchBackend, get_search_backend
+from .renderers import FastJSONRenderer
+from .serializers import (
+    AuthorSerializer,
+    BookCommentWriteSerializer,
+    BookRatingWriteSerializer,
+    BookSerializer,
+    BookWriteSerializer,
+    ValuesSerializer,
+)
+
+
+class BookFacetMixin:
+    """Фильтры по автору и году издания со счетчиками фасетов."""
+
+    @cached_property
+    def filter_form(self) -> BookFilterForm:
+        return BookFilterForm(self.request.GET)
+
+    def filter_books(self, queryset: QuerySet[Any]) -> QuerySet[Any]:
+        self.unfiltered_books = queryset
+        return self.filter_form.filter(queryset)
+
+    def get_facet_rows(self) -> list[tuple]:
+        return facet_rows(self.unfiltered_books)
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["filter_form"] = self.filter_form
+        context["facets"] = build_facets(
+            self.get_facet_rows(),
+            author=self.filter_form.cleaned_data.get("author"),
+            year_from=self.filter_form.cleaned_data.get("year_from"),
+            year_to=self.filter_form.cleaned_data.get("year_to"),
+        )
+        return context
+
 
-from .forms import BookCommentForm, BookForm, BookRatingForm
-from .models import Author, Book, BookComment
-from .serializers import BookSerializer
+class AsyncListMixin:
+    """Асинхронный GET для списков на базе ListView под ASGI.
 
+    Страница списка и количество записей загружаются асинхронным ORM через
+    apaginate_queryset(), а get_context_data() с остальными запросами
+    выполняется в потоке и получает уже готовую страницу.
+    """
 
+    async def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        self.object_list = await sync_to_async(self.get_queryset)()
+        self.async_pagination = await self.apaginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list)
+        )
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+    def paginate_queryset(self, queryset: QuerySet[Any], page_size: int):
+        return self.async_pagination
+
+
+@method_decorator(
+    cache_anonymous_page(["books", "trending"], stale=True), name="get"
+)
 class IndexView(generic.ListView):
     context_object_name = "books"
     paginate_by = 6
     template_name = "index.html"
 
     def get_queryset(self) -> QuerySet[Any]:
-        return sorted(
-            Book.objects.exclude(rating__isnull=True).distinct(),
-            key=lambda book: book.average_rating,
-            reverse=True,
+        return (
+            Book.objects.cards()
+            .filter(trending__isnull=False)
+            .order_by("-trending__score", "trending__book_id")
         )
 
 
-class SearchView(generic.ListView):
+@method_decorator(cache_anonymous_page(["books"], stale=True), name="get")
+class SearchView(BookFacetMixin, generic.ListView):
     context_object_name = "books"
     paginate_by = 6
+    paginator_class = EstimatedCountPaginator
     template_name = "search.html"
 
     def get_queryset(self) -> QuerySet[Any]:
         query = self.request.GET.get("q")
-        if query:
-            return Book.objects.filter(
-                Q(title__icontains=query) | Q(author__name__icontains=query)
+        if not query:
+            return self.filter_books(Book.objects.none())
+        books = Book.objects.cards()
+        if self.fuzzy:
+            books = self.backend.fuzzy_search(books, query)
+        else:
+            books = self.backend.search(books, query)
+        return self.filter_books(books)
+
+    def get_facet_rows(self) -> list[tuple]:
+        query = self.request.GET.get("q")
+        if not query:
+            return []
+        return search_facet_rows(
+            self.unfiltered_books,
+            query,
+            "fuzzy" if self.fuzzy else "search",
+        )
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["fuzzy"] = self.fuzzy
+        context["supports_fuzzy"] = self.backend.supports_fuzzy
+        return context
+
+    @cached_property
+    def backend(self) -> SearchBackend:
+        return get_search_backend()
+
+    @property
+    def fuzzy(self) -> bool:
+        return (
+            self.backend.supports_fuzzy
+            and self.request.GET.get("mode") == "fuzzy"
+        )
+
+
+class AsyncSearchView(AsyncListMixin, AsyncPaginationMixin, SearchView):
+    @markcoroutinefunction
+    @method_decorator(cache_anonymous_page(["books"], stale=True))
+    async def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        return await super().get(request, *args, **kwargs)
+
+
+class AutocompleteView(generic.View):
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> JsonResponse:
+        try:
+            limit = min(
+                int(request.GET.get("limit", settings.AUTOCOMPLETE_LIMIT)),
+                settings.AUTOCOMPLETE_LIMIT,
             )
-        return Book.objects.none()
+        except ValueError:
+            limit = settings.AUTOCOMPLETE_LIMIT
+        results = autocomplete.index.search(request.GET.get("q", ""), limit)
+        return JsonResponse({"results": results})
 
 
-class BookListView(generic.ListView):
-    model = Book
+class BookExportView(generic.View):
+    """Потоковая выгрузка каталога в NDJSON или CSV (``?format=csv``).
+
+    ``?since=`` с датой в ISO 8601 оставляет только книги, измененные с
+    этого момента; для следующей выгрузки достаточно передать
+    ``updated_at`` последней полученной строки.
+    """
+
+    formats = {
+        "ndjson": (export.ndjson_lines, "application/x-ndjson"),
+        "csv": (export.csv_lines, "text/csv; charset=utf-8"),
+    }
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        name = request.GET.get("format", "ndjson")
+        if name not in self.formats:
+            formats = ", ".join(self.formats)
+            return JsonResponse(
+                {"format": f"Поддерживаемые форматы: {formats}"}, status=400
+            )
+        since = None
+        if request.GET.get("since"):
+            try:
+                since = parse_datetime(request.GET["since"])
+            except ValueError:
+                pass
+            if since is None:
+                return JsonResponse(
+                    {"since": "Ожидается дата и время в формате ISO 8601"},
+                    status=400,
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        lines, content_type = self.formats[name]
+        response = StreamingHttpResponse(
+            lines(export.export_rows(since)),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="books.{name}"'
+        )
+        return response
+
+
+@method_decorator(cache_anonymous_page(["books"]), name="get")
+class BookListView(KeysetPaginationMixin, BookFacetMixin, generic.ListView):
+    queryset = Book.objects.cards()
     context_object_name = "books"
     paginate_by = 6
+    paginator_class = EstimatedCountPaginator
+    keyset_ordering = ("title", "author__name", "id")
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return self.filter_books(super().get_queryset())
 
+    def get_facet_rows(self) -> list[tuple]:
+        return catalog_facet_rows()
 
-class BookDetailView(generic.DetailView, MultipleObjectMixin):
-    model = Book
+
+class AsyncBookListView(AsyncListMixin, BookListView):
+    @markcoroutinefunction
+    @method_decorator(cache_anonymous_page(["books"]))
+    async def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        return await super().get(request, *args, **kwargs)
+
+
+@method_decorator(conditional(book_version), name="get")
+@method_decorator(cache_anonymous_page(object_scope("book")), name="get")
+class BookDetailView(
+    KeysetPaginationMixin, generic.DetailView, MultipleObjectMixin
+):
+    queryset = Book.objects.select_related("author")
     paginate_by = 6
+    keyset_ordering = ("-created_at", "id")
 
     def get_success_url(self) -> str:
         return reverse("book-detail", kwargs={"pk": self.object.pk})
@@ -68,7 +292,9 @@ class BookDetailView(generic.DetailView, MultipleObjectMixin):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         self.object = self.get_object()
-        object_list = BookComment.objects.filter(book=self.object)
+        object_list = BookComment.objects.select_related("user").filter(
+            book=self.object
+        )
         context = super().get_context_data(object_list=object_list, **kwargs)
         context["comment_form"] = BookCommentForm()
         context["rating_form"] = BookRatingForm()
@@ -90,9 +316,11 @@ class BookDetailView(generic.DetailView, MultipleObjectMixin):
                 context=self.get_context_data(**kwargs)
             )
         elif rating_form.is_valid():
-            rating_form.instance.user = self.request.user
-            rating_form.instance.book = self.object
-            rating_form.save()
+            BookRating.objects.upsert(
+                book=self.object,
+                user=self.request.user,
+                rate=rating_form.cleaned_data["rate"],
+            )
             return self.render_to_response(
                 context=self.get_context_data(**kwargs)
             )
@@ -172,34 +400,402 @@ class BookCommentDeleteView(LoginRequiredMixin, generic.DeleteView):
         return super().post(request, *args, **kwargs)
 
 
-class AuthorListView(generic.ListView):
-    model = Author
+@method_decorator(cache_anonymous_page(["authors"]), name="get")
+class AuthorListView(KeysetPaginationMixin, generic.ListView):
+    queryset = Author.objects.cards()
     context_object_name = "authors"
     paginate_by = 6
+    keyset_ordering = ("name", "id")
 
 
-class AuthorDetailView(generic.DetailView, MultipleObjectMixin):
+@method_decorator(conditional(author_version), name="get")
+@method_decorator(cache_anonymous_page(object_scope("author")), name="get")
+class AuthorDetailView(
+    KeysetPaginationMixin, generic.DetailView, MultipleObjectMixin
+):
     model = Author
     context_object_name = "author"
     paginate_by = 6
+    keyset_ordering = ("title", "id")
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return Author.objects.cached()
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        object_list = Book.objects.filter(author=self.object)
+        object_list = Book.objects.cards().filter(author=self.object).cached()
         return super().get_context_data(object_list=object_list, **kwargs)
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 6
-    page_size_query_param = "page_size"
-    max_page_size = 20
+class BookAPIMixin:
+    """Параметры ``fields`` и ``expand`` для API книг.
 
+    ``?fields=id,title`` оставляет в ответе только перечисленные поля и
+    загружает из базы только их, ``?expand=author`` встраивает данные
+    автора, выбирая их тем же запросом.
+    """
 
-class BooksListAPIView(generics.ListAPIView):
-    queryset = Book.objects.all()
     serializer_class = BookSerializer
-    pagination_class = StandardResultsSetPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
+    def get_queryset(self) -> QuerySet[Any]:
+        queryset = Book.objects.all()
+        if "author" in self.expand:
+            queryset = queryset.select_related("author")
+        if self.requested_fields is not None:
+            fields = ["id", *self.requested_fields]
+            if "author" in self.expand:
+                fields.extend(
+                    f"author__{name}" for name in AuthorSerializer.Meta.fields
+                )
+            queryset = queryset.only(*fields)
+        return queryset
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> BookSerializer:
+        kwargs.setdefault("fields", self.requested_fields)
+        kwargs.setdefault("expand", self.expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_values_serializer(self) -> ValuesSerializer:
+        return ValuesSerializer(self.get_serializer())
+
+    @cached_property
+    def requested_fields(self) -> list[str] | None:
+        if "fields" not in self.request.query_params:
+            return None
+        fields = self._split_param("fields")
+        unknown = set(fields) - set(BookSerializer().fields)
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Неизвестные поля: {', '.join(sorted(unknown))}"}
+            )
+        return fields
+
+    @cached_property
+    def expand(self) -> list[str]:
+        expand = self._split_param("expand")
+        unknown = set(expand) - set(BookSerializer.expandable_fields)
+        if unknown:
+            raise ValidationError(
+                {"expand": f"Неизвестные поля: {', '.join(sorted(unknown))}"}
+            )
+        if self.requested_fields is not None:
+            expand = [name for name in expand if name in self.requested_fields]
+        return expand
 
-class BooksRetrieveAPIView(generics.RetrieveAPIView):
-    queryset = Book.objects.all()
-    serializer_class = BookSerializer
+    def _split_param(self, name: str) -> list[str]:
+        value = self.request.query_params.get(name, "")
+        return [field for field in map(str.strip, value.split(",")) if field]
+
+
+class AsyncAPIViewMixin:
+    """Асинхронный dispatch() для представлений DRF под ASGI.
+
+    Аутентификация и проверка прав (initial()) выполняются в потоке через
+    sync_to_async, а обработчик метода может быть корутиной.
+    """
+
+    async def dispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            response = handler(request, *args, **kwargs)
+            if iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+
+class BooksListAPIView(BookAPIMixin, generics.ListAPIView):
+    pagination_class = KeysetResultsSetPagination
+    keyset_ordering = ("title", "author__name", "id")
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = self.get_values_serializer()
+        page = self.paginate_queryset(self.get_values_queryset(serializer))
+        return self.get_conditional_response(serializer, page)
+
+    def get_values_queryset(self, serializer: ValuesSerializer) -> QuerySet:
+        lookups = dict.fromkeys(
+            [
+                *serializer.lookups,
+                *(name.lstrip("-") for name in self.keyset_ordering),
+                "updated_at",
+            ]
+        )
+        return self.filter_queryset(self.get_queryset()).values(*lookups)
+
+    def get_conditional_response(
+        self, serializer: ValuesSerializer, page: "list[dict]"
+    ) -> HttpResponse:
+        def respond() -> Response:
+            data = [serializer.to_representation(row) for row in page]
+            return self.get_paginated_response(data)
+
+        count = (
+            None
+            if self.paginator.keyset_page is not None
+            else self.paginator.page.paginator.count
+        )
+        return conditional_page(self.request, page, respond, count)
+
+
+class AsyncBooksListAPIView(AsyncAPIViewMixin, BooksListAPIView):
+    @markcoroutinefunction
+    async def get(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        serializer = self.get_values_serializer()
+        page = await self.paginator.apaginate_queryset(
+            self.get_values_queryset(serializer), request, view=self
+        )
+        return self.get_conditional_response(serializer, page)
+
+
+@method_decorator(conditional(book_version), name="get")
+class BooksRetrieveAPIView(BookAPIMixin, generics.RetrieveAPIView):
+    def retrieve(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        serializer = self.get_values_serializer()
+        row = generics.get_object_or_404(
+            self.filter_queryset(self.get_queryset()).values(
+                *serializer.lookups
+            ),
+            **self.get_lookup(),
+        )
+        return Response(serializer.to_representation(row))
+
+    def get_lookup(self) -> dict[str, Any]:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+
+class AsyncBooksRetrieveAPIView(AsyncAPIViewMixin, BooksRetrieveAPIView):
+    @markcoroutinefunction
+    @method_decorator(conditional(book_version))
+    async def get(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        serializer = self.get_values_serializer()
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *serializer.lookups
+        )
+        try:
+            row = await queryset.aget(**self.get_lookup())
+        except (
+            ObjectDoesNotExist,
+            DjangoValidationError,
+            TypeError,
+            ValueError,
+        ):
+            raise Http404
+        return Response(serializer.to_representation(row))
+
+
+class BooksBatchAPIView(BookAPIMixin, generics.GenericAPIView):
+    """Несколько книг по списку идентификаторов одним запросом к базе.
+
+    Идентификаторы передаются параметром ``ids`` через запятую или, для
+    длинных списков, в теле POST-запроса ``{"ids": [...]}``. Книги
+    возвращаются в порядке запроса, а ненайденные идентификаторы
+    перечисляются в ``missing``.
+    """
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return self.batch(self._split_param("ids"))
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        ids = (
+            request.data.get("ids") if isinstance(request.data, dict) else None
+        )
+        if not isinstance(ids, list):
+            raise ValidationError({"ids": "Ожидается список идентификаторов"})
+        return self.batch(ids)
+
+    def batch(self, ids: list) -> Response:
+        if len(ids) > settings.BOOKS_BATCH_MAX_IDS:
+            raise ValidationError(
+                {
+                    "ids": "Количество идентификаторов не должно превышать "
+                    f"{settings.BOOKS_BATCH_MAX_IDS}"
+                }
+            )
+        keys = []
+        for value in ids:
+            try:
+                keys.append(UUID(str(value)))
+            except ValueError:
+                raise ValidationError(
+                    {"ids": f"Некорректный идентификатор: {value}"}
+                )
+        keys = list(dict.fromkeys(keys))
+        serializer = self.get_values_serializer()
+        rows = {
+            row["id"]: row
+            for row in self.get_queryset()
+            .filter(pk__in=keys)
+            .order_by()
+            .values(*serializer.lookups)
+        }
+        return Response(
+            {
+                "results": [
+                    serializer.to_representation(rows[key])
+                    for key in keys
+                    if key in rows
+                ],
+                "missing": [str(key) for key in keys if key not in rows],
+            }
+        )
+
+
+class BulkWriteAPIView(ABC, generics.GenericAPIView):
+    """Пакетная запись списка объектов одним запросом.
+
+    Все элементы проверяются за один проход, существование связанных
+    объектов из ``related_models`` — одним запросом на модель. Корректные
+    элементы записываются в одной транзакции методом perform_bulk_write(),
+    который определяют подклассы, а ответ содержит результат для каждого
+    элемента в порядке запроса.
+    """
+
+    permission_classes = [IsAuthenticated]
+    related_models = {}
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"detail": "Ожидается список объектов"})
+        if len(items) > settings.BULK_WRITE_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    "detail": "Количество объектов не должно превышать "
+                    f"{settings.BULK_WRITE_MAX_ITEMS}"
+                }
+            )
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index] = {
+                    "status": "invalid",
+                    "errors": serializer.errors,
+                }
+        for name, model in self.related_models.items():
+            existing = set(
+                model.objects.filter(
+                    pk__in={data[f"{name}_id"] for data in valid.values()}
+                )
+                .order_by()
+                .values_list("pk", flat=True)
+            )
+            for index, data in list(valid.items()):
+                if data[f"{name}_id"] not in existing:
+                    del valid[index]
+                    results[index] = {
+                        "status": "invalid",
+                        "errors": {name: ["Объект не найден"]},
+                    }
+        if valid:
+            with transaction.atomic():
+                written = self.perform_bulk_write(list(valid.values()))
+            for index, result in zip(valid, written):
+                results[index] = result
+        return Response({"results": results})
+
+    @abstractmethod
+    def perform_bulk_write(self, items: list[dict]) -> list[dict]:
+        """Записывает проверенные элементы и возвращает результаты в том
+        же порядке."""
+
+
+class BooksBulkCreateAPIView(BulkWriteAPIView):
+    serializer_class = BookWriteSerializer
+    related_models = {"author": Author}
+
+    def perform_bulk_write(self, items: list[dict]) -> list[dict]:
+        books = Book.objects.bulk_create(
+            [Book(added_by=self.request.user, **data) for data in items]
+        )
+        book_ids = [book.pk for book in books]
+        if connection.vendor == "postgresql":
+            Book.objects.filter(pk__in=book_ids).update(
+                search_vector=Book.search_vector_expression()
+            )
+        transaction.on_commit(lambda: self.index_books(books))
+        return [{"status": "created", "id": book.pk} for book in books]
+
+    @staticmethod
+    def index_books(books: list[Book]) -> None:
+        for book in books:
+            autocomplete.index.add("book", book.pk, book.title)
+        bump_catalog_version()
+        caching.invalidate(
+            "books", *(f"author:{book.author_id}" for book in books)
+        )
+
+
+class BookRatingsBulkUpsertAPIView(BulkWriteAPIView):
+    serializer_class = BookRatingWriteSerializer
+    related_models = {"book": Book}
+
+    def perform_bulk_write(self, items: list[dict]) -> list[dict]:
+        rates = {data["book_id"]: data["rate"] for data in items}
+        rated = BookRating.objects.bulk_upsert(self.request.user, rates)
+        rating_ids = dict(
+            BookRating.objects.filter(
+                user=self.request.user, book__in=rates
+            ).values_list("book_id", "pk")
+        )
+        results = []
+        for data in items:
+            book_id = data["book_id"]
+            results.append(
+                {
+                    "status": "updated" if book_id in rated else "created",
+                    "id": rating_ids[book_id],
+                }
+            )
+            rated.add(book_id)
+        return results
+
+
+class BookCommentsBulkCreateAPIView(BulkWriteAPIView):
+    serializer_class = BookCommentWriteSerializer
+    related_models = {"book": Book}
+
+    def perform_bulk_write(self, items: list[dict]) -> list[dict]:
+        comments = BookComment.objects.bulk_create(
+            [BookComment(user=self.request.user, **data) for data in items]
+        )
+        Book.touch(*{comment.book_id for comment in comments})
+        return [
+            {"status": "created", "id": comment.pk} for comment in comments
+        ]
+
+
+class CacheStatsAPIView(generics.GenericAPIView):
+    """Счетчики попаданий в кэш для мониторинга (только для персонала)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return Response(caching.get_stats())
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "catalog",
     "accounts",
@@ -94,6 +95,33 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Several workers need a shared backend (e.g. memcached) so that model
+# signals invalidate cached pages for all of them. The default cache keeps
+# hot entries in process memory in front of it; counters use "shared"
+
+CACHES = {
+    "default": {
+        "BACKEND": "catalog.cache_backends.TieredCache",
+        "LOCATION": "shared",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.environ.get("CACHE_LOCAL_MAX_ENTRIES", default=1000)
+            ),
+            "LOCAL_TIMEOUT": int(
+                os.environ.get("CACHE_LOCAL_TIMEOUT", default=60)
+            ),
+        },
+    },
+    "shared": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    },
+}
+
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 
@@ -143,3 +171,84 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+
+# Search backend class (dotted path); chosen from the database vendor if unset
+
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND")
+
+# Full-text search configuration used for the book search vector
+
+SEARCH_CONFIG = "russian"
+
+# Word similarity threshold for the typo-tolerant (fuzzy) search mode
+
+SEARCH_TRIGRAM_THRESHOLD = float(
+    os.environ.get("SEARCH_TRIGRAM_THRESHOLD", default=0.4)
+)
+
+# Search box suggestions served from the in-process prefix index
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_REFRESH_INTERVAL = 300
+
+# Paginated listings use the planner's row estimate instead of COUNT(*)
+# once it reaches this many rows
+
+PAGINATION_ESTIMATE_THRESHOLD = 10000
+
+# Facet counts on the book list and search pages
+
+FACETS_AUTHOR_LIMIT = 10
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+# Catalog export: rows fetched from the database cursor per chunk
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Maximum number of ids accepted by the batch book retrieval API endpoint
+
+BOOKS_BATCH_MAX_IDS = 100
+
+# Maximum number of items accepted by the bulk write API endpoints
+
+BULK_WRITE_MAX_ITEMS = 10000
+
+# Anonymous catalog pages are cached until model signals invalidate them
+
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Expired cache entries of the front page, search and facets are served for
+# CACHE_STALE_TIMEOUT more seconds while one worker holding the recompute
+# lock (at most CACHE_LOCK_TIMEOUT seconds) rebuilds them
+
+CACHE_STALE_TIMEOUT = 5 * 60
+
+CACHE_LOCK_TIMEOUT = 30
+
+# Without a stale entry other workers wait this long (seconds) for the lock
+# holder and then compute the value themselves
+
+CACHE_LOCK_WAIT = 0.15
+
+# Results of querysets marked with .cached(), invalidated by model writes;
+# QUERYSET_CACHE=0 turns the cache off
+
+QUERYSET_CACHE = bool(int(os.environ.get("QUERYSET_CACHE", default=1)))
+
+QUERYSET_CACHE_TIMEOUT = 60 * 60
+
+# Rendered book and author cards, keyed by the object's modification time
+
+FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Serve the book list, search and read API with async views (ASGI deployment)
+
+ASYNC_VIEWS = bool(int(os.environ.get("ASYNC_VIEWS", default=0)))
+
+# Trending books on the index page
+# Bayesian prior plus weighted rating activity over rolling windows (days)
+
+TRENDING_PRIOR_MEAN = 3.0
+TRENDING_PRIOR_WEIGHT = 10
+TRENDING_WINDOWS = {7: 1.0, 30: 0.5}
+TRENDING_ACTIVITY_WEIGHT = 0.5